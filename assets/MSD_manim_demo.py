@@ -6,12 +6,180 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from quera_colors import *
 from quera_qubit_lib import *
+from manimlib.logger import log
+from aod_compiler import SITE_PITCH_UM, MotionModel, compile_moves
 
 USE_TWEEZERS = False  # Toggle laser tweezer visuals ON or OFF
+COMPILE_MOVES = False  # Compile column swaps into AOD steps instead of hand-written legs
+PHYSICAL_TIMING = False  # Time moves from distance and AOD speed / acceleration limits
+
+
+class MoveLeg:
+    """One recorded bulk move whose interpolation data can be replayed time-mirrored.
+
+    When the leg starts, the points of every moving atom are gathered into
+    one buffer together with the atom each point belongs to. Every frame is
+    then a single array operation over that buffer. Each atom mobject owns
+    its point array, so the result is written back slice by slice, without
+    per-atom shift() calls.
+    """
+
+    def __init__(self, array, indices, start, end, run_time, rate_func=smooth, duration_us=0.0):
+        self.array = array
+        self.indices = indices
+        self.start = start
+        self.end = end
+        self.delta = end - start
+        self.run_time = run_time
+        self.rate_func = rate_func
+        self.duration_us = duration_us
+        self.mobs = [array.get_qubit(idx) for idx in indices]
+        self.current = start.copy()
+        self.animation = UpdateFromAlphaFunc(Mobject(), self._update, remover=True)
+
+    def _gather(self):
+        """Snapshot the moving atoms' points as one (N, 3) buffer with an owner row per point."""
+        pairs = [(row, leaf) for row, mob in enumerate(self.mobs) for leaf in mob.family_members_with_points()]
+        self.leaves = [leaf for _, leaf in pairs]
+        sizes = [len(leaf.get_points()) for leaf in self.leaves]
+        self.bounds = np.cumsum([0] + sizes)
+        self.owner = np.repeat([row for row, _ in pairs], sizes).astype(int)
+        self.base_points = np.concatenate([leaf.get_points() for leaf in self.leaves] or [np.zeros((0, 3))])
+        self.base_positions = self.current.copy()
+
+    def _update(self, _, alpha):
+        new = self.start + alpha * self.delta
+        points = self.base_points + (new - self.base_positions)[self.owner]
+        for leaf, a, b in zip(self.leaves, self.bounds[:-1], self.bounds[1:]):
+            leaf.set_points(points[a:b])
+        self.current[:] = new
+
+    def play(self, scene, reverse=False, animate=True):
+        self._gather()
+        if animate:
+            rate_func = (lambda t: self.rate_func(1 - t)) if reverse else self.rate_func
+            scene.play(self.animation, run_time=self.run_time, rate_func=rate_func)
+        else:
+            self._update(None, 0.0 if reverse else 1.0)
+        for mob in self.mobs:
+            mob.refresh_bounding_box(recurse_down=True)
+        self.array.physical_time += self.duration_us
+        self.array._land(self.indices, self.start if reverse else self.end)
+
+
+def replay_reversed(scene, legs):
+    """Undo a recorded sequence of legs by replaying them backwards in time."""
+    for leg in reversed(legs):
+        leg.play(scene, reverse=True)
+
+
+class TweezerPool:
+    """Hidden DotLaserTweezers handed out per swap cycle and taken back afterwards.
+
+    The pool only grows when more tweezers are held at once than ever before,
+    so the scene keeps a fixed set of tweezer mobjects for the whole run.
+    """
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.free = []
+        self.size = 0
+
+    def reserve(self, count):
+        while self.size < count:
+            tw = DotLaserTweezer().set_opacity(0)
+            self.scene.add(tw)
+            self.free.append(tw)
+            self.size += 1
+
+    def acquire(self, positions):
+        """Return one hidden tweezer moved to each position."""
+        self.reserve(self.size - len(self.free) + len(positions))
+        tweezers = [self.free.pop() for _ in positions]
+        for tw, pos in zip(tweezers, positions):
+            tw.move_to(pos)
+        return tweezers
+
+    def release(self, tweezers):
+        self.free.extend(tweezers)
+
+
+class IndexedQubitArray(QubitArray):
+    """QubitArray that keeps (row, col) <-> index maps in sync with move_qubits."""
+
+    def __init__(self, rows, cols, **kwargs):
+        super().__init__(rows=rows, cols=cols, **kwargs)
+        self.grid_rows = rows
+        self.grid_cols = cols
+        self.atom_positions = np.array([pos for _, pos in self.qubits], dtype=float)
+        self.site_of = {}     # idx -> (row, col), only for atoms sitting on a site
+        self.site_index = {}  # (row, col) -> idx
+        self.by_col = {}
+        self.by_row = {}
+        self.physical_time = 0.0  # us of AOD motion played so far
+        self._place(range(len(self.atom_positions)))
+
+    def _place(self, indices):
+        for idx in indices:
+            old = self.site_of.pop(idx, None)
+            if old is not None:
+                del self.site_index[old]
+                self.by_row[old[0]].discard(idx)
+                self.by_col[old[1]].discard(idx)
+            row, col = self.site_coords(idx)
+            if abs(col - round(col)) > 1e-3 or abs(row - round(row)) > 1e-3:
+                continue  # parked between sites mid-move
+            site = (int(round(row)), int(round(col)))
+            self.site_of[idx] = site
+            self.site_index[site] = idx
+            self.by_row.setdefault(site[0], set()).add(idx)
+            self.by_col.setdefault(site[1], set()).add(idx)
+
+    def site_coords(self, indices=slice(None)):
+        """Fractional (row, col) grid coordinates of atoms."""
+        pos = self.atom_positions[indices]
+        col = pos[..., 0] / self.qubit_spacing + (self.grid_cols - 1) / 2
+        row = (self.grid_rows - 1) / 2 - pos[..., 1] / self.qubit_spacing
+        return np.stack([row, col], axis=-1)
+
+    def indices_in_cols(self, cols):
+        """(idx, col) pairs of every atom sitting in one of `cols`."""
+        return [(idx, col) for col in cols for idx in sorted(self.by_col.get(col, ()))]
+
+    def indices_in_rows(self, rows):
+        """(idx, row) pairs of every atom sitting in one of `rows`."""
+        return [(idx, row) for row in rows for idx in sorted(self.by_row.get(row, ()))]
+
+    def move_bulk(self, scene, indices, shifts=None, targets=None, run_time=0.2, animate=True,
+                  rate_func=smooth, duration_us=0.0):
+        """Move many atoms at once: NumPy indices plus (k, 3) shifts or target positions.
+
+        Returns the MoveLeg so the move can be replayed reversed later.
+        """
+        indices = np.asarray(indices, dtype=int)
+        start = self.atom_positions[indices].copy()
+        end = start + np.asarray(shifts) if targets is None else np.asarray(targets, dtype=float)
+        leg = MoveLeg(self, indices, start, end, run_time, rate_func, duration_us)
+        leg.play(scene, animate=animate)
+        return leg
+
+    def _land(self, indices, positions):
+        self.atom_positions[indices] = positions
+        for idx, pos in zip(indices, positions):
+            self.qubits[idx] = (self.qubits[idx][0], pos)
+        self._place(indices)
+
+    def move_qubits(self, scene, moves, **kwargs):
+        result = super().move_qubits(scene, moves, **kwargs)
+        for idx, dx, dy in moves:
+            self.atom_positions[idx, 0] += dx
+            self.atom_positions[idx, 1] += dy
+        self._place([idx for idx, _, _ in moves])
+        return result
 
 class MSDScene(Scene):
     def construct(self):
-        array = QubitArray(
+        array = IndexedQubitArray(
             layout="grid",
             rows=5, cols=17,
             qubit_spacing=0.7,
@@ -19,6 +187,8 @@ class MSDScene(Scene):
             fill_pattern="all"
         )
         self.add(array)
+        self.tweezers = TweezerPool(self)
+        self.motion = MotionModel(um_per_unit=SITE_PITCH_UM / array.qubit_spacing)
         self.wait(0.1)
 
         # --- COLUMN‐BASED TRAPEZOIDAL SWAPS (can comment out for speed) ---
@@ -36,17 +206,42 @@ class MSDScene(Scene):
             [2, 6, 8, 12, 13],
             [1, 3, 5, 7, 9, 15],
         ]
+        source_rows = [[2, 4], [1, 3], [0, 1]]
+        target_rows = [[1, 3], [0, 2], [3, 4]]
+        if USE_TWEEZERS:
+            self.tweezers.reserve(max(
+                [len(array.indices_in_cols(cols)) for cols in source_cols]
+                + [len(array.indices_in_rows(rows)) for rows in source_rows]
+            ))
         for s_cols, t_cols in zip(source_cols, target_cols):
-            self.perform_swap_cycle(array, s_cols, t_cols)
+            if COMPILE_MOVES and not USE_TWEEZERS:
+                self.perform_compiled_swap_cycle(array, s_cols, t_cols)
+            else:
+                self.perform_swap_cycle(array, s_cols, t_cols)
             self.wait(0.2)
 
         # --- ROW‐BASED L‐SHAPED SWAPS (only for faster testing) ---
-        source_rows = [[2, 4], [1, 3], [0, 1]]
-        target_rows = [[1, 3], [0, 2], [3, 4]]
         for s_rows, t_rows in zip(source_rows, target_rows):
             self.perform_row_swap_cycle(array, s_rows, t_rows)
             self.wait(0.2)
 
+        if PHYSICAL_TIMING:
+            log.info(f"physical move time: {array.physical_time:.1f} us")
+
+    def move_timing(self, shifts, run_time):
+        """Kwargs for one parallel move: the fixed run_time, or the AOD motion model's timing."""
+        if not PHYSICAL_TIMING:
+            return {"run_time": run_time}
+        return self.motion.timing(shifts)
+
+    def play_timed(self, array, animations, timing):
+        """Play tweezer animations with move_timing() kwargs and count their physical time."""
+        if not animations:
+            return
+        timing = dict(timing)
+        array.physical_time += timing.pop("duration_us", 0.0)
+        self.play(*animations, **timing)
+
     def perform_swap_cycle(self, array, source_cols, target_cols):
         """Column‐based trapezoidal swaps with optional tweezers."""
         spacing = array.qubit_spacing
@@ -54,17 +249,17 @@ class MSDScene(Scene):
         col_map = dict(zip(source_cols, target_cols))
 
         # Identify qubits and prepare tweezers
-        active = []   # list of (idx, src_col)
+        active = array.indices_in_cols(source_cols)   # list of (idx, src_col)
+        atoms = np.array([i for i, _ in active], dtype=int)
+        src = np.array([col for _, col in active])
+        down = np.zeros((len(atoms), 3))
+        down[:, 1] = -offset
+        across = np.zeros((len(atoms), 3))
+        across[:, 0] = (np.array([col_map[col] for col in src]) - src) * spacing - offset
         tweezers = []
-        for idx, (q, pos) in enumerate(array.qubits):
-            x, _, _ = pos
-            for col in source_cols:
-                if abs(x - ((col - 8) * spacing)) < 1e-3:
-                    active.append((idx, col))
-                    if USE_TWEEZERS:
-                        tw = DotLaserTweezer().move_to(pos).set_opacity(0)
-                        self.add(tw)
-                        tweezers.append((tw, idx, col))
+        if USE_TWEEZERS:
+            pooled = self.tweezers.acquire(array.atom_positions[atoms])
+            tweezers = [(tw, idx, col) for tw, (idx, col) in zip(pooled, active)]
 
         # Pick up
         if USE_TWEEZERS:
@@ -75,15 +270,18 @@ class MSDScene(Scene):
                 for tw, idx, _ in tweezers
             ], run_time=0.1)
 
+        vertical = self.move_timing(down, 0.05)
+        horizontal = self.move_timing(across, 0.2)
+
         # Step 1: DOWN
+        legs = []
         if USE_TWEEZERS:
-            self.play(*[
+            self.play_timed(array, [
                 tw.animate.shift(DOWN * offset)
                 for tw, _, _ in tweezers
-            ], run_time=0.05)
+            ], vertical)
         else:
-            moves = [(idx, 0, -offset) for idx, _ in active]
-            array.move_qubits(self, moves, run_time=0.05, animate=True)
+            legs.append(array.move_bulk(self, atoms, down, **vertical))
 
         # Step 2: HORIZONTAL
         if USE_TWEEZERS:
@@ -91,51 +289,38 @@ class MSDScene(Scene):
             for tw, _, src in tweezers:
                 dx = (col_map[src] - src) * spacing - offset
                 h_anims.append(tw.animate.shift(RIGHT * dx))
-            self.play(*h_anims, run_time=0.2)
+            self.play_timed(array, h_anims, horizontal)
         else:
-            moves = []
-            for idx, src in active:
-                dx = (col_map[src] - src) * spacing - offset
-                moves.append((idx, dx, 0))
-            array.move_qubits(self, moves, run_time=0.2, animate=True)
+            legs.append(array.move_bulk(self, atoms, across, **horizontal))
 
         # Step 3: UP
         if USE_TWEEZERS:
-            self.play(*[
+            self.play_timed(array, [
                 tw.animate.shift(UP * offset)
                 for tw, _, _ in tweezers
-            ], run_time=0.05)
+            ], vertical)
         else:
-            moves = [(idx, 0, offset) for idx, _ in active]
-            array.move_qubits(self, moves, run_time=0.05, animate=True)
+            legs.append(array.move_bulk(self, atoms, -down, **vertical))
 
         self.wait(0.1)
 
         # Reverse: DOWN → HORIZONTAL back → UP
         if USE_TWEEZERS:
-            self.play(*[
+            self.play_timed(array, [
                 tw.animate.shift(DOWN * offset)
                 for tw, _, _ in tweezers
-            ], run_time=0.05)
+            ], vertical)
             rev_h = []
             for tw, _, src in tweezers:
                 dx = (src - col_map[src]) * spacing + offset
                 rev_h.append(tw.animate.shift(RIGHT * dx))
-            self.play(*rev_h, run_time=0.2)
-            self.play(*[
+            self.play_timed(array, rev_h, horizontal)
+            self.play_timed(array, [
                 tw.animate.shift(UP * offset)
                 for tw, _, _ in tweezers
-            ], run_time=0.05)
+            ], vertical)
         else:
-            moves = [(idx, 0, -offset) for idx, _ in active]
-            array.move_qubits(self, moves, run_time=0.05, animate=True)
-            moves = []
-            for idx, src in active:
-                dx = (src - col_map[src]) * spacing + offset
-                moves.append((idx, dx, 0))
-            array.move_qubits(self, moves, run_time=0.2, animate=True)
-            moves = [(idx, 0, offset) for idx, _ in active]
-            array.move_qubits(self, moves, run_time=0.05, animate=True)
+            replay_reversed(self, legs)
 
         # Release
         if USE_TWEEZERS:
@@ -143,7 +328,37 @@ class MSDScene(Scene):
                 tw.release(hide=True)[0]
                 for tw, _, _ in tweezers
             ], run_time=0.1)
+            self.tweezers.release([tw for tw, _, _ in tweezers])
+
 
+    def perform_compiled_swap_cycle(self, array, source_cols, target_cols):
+        """Park source columns beside target columns via compiled AOD steps, then undo."""
+        col_map = dict(zip(source_cols, target_cols))
+        active = array.indices_in_cols(source_cols)
+        atoms = [idx for idx, _ in active]
+        sites = array.site_coords()
+        targets = [(sites[idx, 0], col_map[col] - 0.3) for idx, col in active]
+
+        schedule = compile_moves(sites, atoms, targets)
+        legs = self.play_aod_schedule(array, schedule)
+        self.wait(0.1)
+        replay_reversed(self, legs)
+
+    def play_aod_schedule(self, array, schedule, run_time=0.2):
+        """Play each compiled step as a lift / travel / drop trapezoid; return the legs."""
+        spacing = array.qubit_spacing
+        legs = []
+        for step in schedule.steps:
+            lift = np.zeros((len(step.atoms), 3))
+            lift[:, 1] = -0.3 * spacing
+            travel = np.zeros((len(step.atoms), 3))
+            travel[:, 0] = step.shifts[:, 1] * spacing
+            travel[:, 1] = -step.shifts[:, 0] * spacing
+            vertical = self.move_timing(lift, 0.05)
+            legs.append(array.move_bulk(self, step.atoms, lift, **vertical))
+            legs.append(array.move_bulk(self, step.atoms, travel, **self.move_timing(travel, run_time)))
+            legs.append(array.move_bulk(self, step.atoms, -lift, **vertical))
+        return legs
 
     def perform_row_swap_cycle(self, array, source_rows, target_rows):
         """Row‐based L‐shaped swaps with optional tweezers."""
@@ -151,17 +366,17 @@ class MSDScene(Scene):
         offset = 0.3 * spacing
         row_map = dict(zip(source_rows, target_rows))
 
-        active = []    # list of (idx, src_row)
+        active = array.indices_in_rows(source_rows)    # list of (idx, src_row)
+        atoms = np.array([i for i, _ in active], dtype=int)
+        src = np.array([row for _, row in active])
+        right = np.zeros((len(atoms), 3))
+        right[:, 0] = offset
+        vertical_shift = np.zeros((len(atoms), 3))
+        vertical_shift[:, 1] = (src - np.array([row_map[row] for row in src])) * spacing
         tweezers = []
-        for idx, (q, pos) in enumerate(array.qubits):
-            _, y, _ = pos
-            for row in source_rows:
-                if abs(y - ((2 - row) * spacing)) < 1e-3:
-                    active.append((idx, row))
-                    if USE_TWEEZERS:
-                        tw = DotLaserTweezer().move_to(pos).set_opacity(0)
-                        self.add(tw)
-                        tweezers.append((tw, idx, row))
+        if USE_TWEEZERS:
+            pooled = self.tweezers.acquire(array.atom_positions[[idx for idx, _ in active]])
+            tweezers = [(tw, idx, row) for tw, (idx, row) in zip(pooled, active)]
 
         # Pick up
         if USE_TWEEZERS:
@@ -172,18 +387,21 @@ class MSDScene(Scene):
                 for tw, idx, _ in tweezers
             ], run_time=0.1)
 
+        sideways = self.move_timing(right, 0.05)
+        vertical = self.move_timing(vertical_shift, 0.2)
+
         # Step 1: RIGHT
-        self.play(*[
+        self.play_timed(array, [
             tw.animate.shift(RIGHT * offset)
             for tw, _, _ in tweezers
-        ], run_time=0.05)
+        ], sideways)
 
         # Step 2: VERTICAL
         v_anims = []
         for tw, _, src in tweezers:
             dy = (row_map[src] - src) * -spacing
             v_anims.append(tw.animate.shift(UP * dy))
-        self.play(*v_anims, run_time=0.2)
+        self.play_timed(array, v_anims, vertical)
         self.wait(0.1)
 
         # Reverse vertical
@@ -191,16 +409,17 @@ class MSDScene(Scene):
         for tw, _, src in tweezers:
             dy = (src - row_map[src]) * -spacing
             rv.append(tw.animate.shift(UP * dy))
-        self.play(*rv, run_time=0.2)
+        self.play_timed(array, rv, vertical)
 
         # Step 3: LEFT back
-        self.play(*[
+        self.play_timed(array, [
             tw.animate.shift(LEFT * offset)
             for tw, _, _ in tweezers
-        ], run_time=0.05)
+        ], sideways)
 
         # Release
         self.play(*[
             tw.release(hide=True)[0]
             for tw, _, _ in tweezers
         ], run_time=0.1)
+        self.tweezers.release([tw for tw, _, _ in tweezers])
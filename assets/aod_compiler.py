@@ -0,0 +1,155 @@
+import numpy as np
+
+SITE_PITCH_UM = 5.0      # distance between neighbouring sites
+MAX_SPEED_UM_US = 0.55   # AOD sweep speed
+MAX_ACCEL_UM_US2 = 2.75e-3  # AOD acceleration limit (2750 m/s^2)
+SECONDS_PER_US = 2e-3    # animation seconds per physical microsecond
+MIN_RUN_TIME = 0.05
+TRANSFER_TIME_US = 15.0  # SLM -> AOD hand-off, paid on pick-up and on drop
+
+
+class AODStep:
+    """One parallel tweezer move.
+
+    row_tones/col_tones map each active tone's site coordinate to its shared
+    offset; every atom at an active row x col intersection moves by the pair.
+    """
+
+    def __init__(self, atoms, shifts, row_tones, col_tones, duration):
+        self.atoms = atoms
+        self.shifts = shifts
+        self.row_tones = row_tones
+        self.col_tones = col_tones
+        self.duration = duration
+
+
+class AODSchedule:
+    def __init__(self, steps):
+        self.steps = steps
+        self.total_time = sum(step.duration for step in steps)
+
+
+def _key(x):
+    return round(float(x), 6)
+
+
+def _order_preserved(tones):
+    src = sorted(tones)
+    dst = [s + tones[s] for s in src]
+    return all(a < b for a, b in zip(dst, dst[1:]))
+
+
+def constant_jerk(t):
+    """S-curve position with piecewise constant jerk: triangular acceleration, no cruise."""
+    if t > 0.5:
+        return 1 - constant_jerk(1 - t)
+    if t <= 0.25:
+        return 16 / 3 * t ** 3
+    u = 0.5 - t
+    return 0.5 - 2 * u + 16 / 3 * u ** 3
+
+
+def move_time(distance, speed=MAX_SPEED_UM_US, accel=MAX_ACCEL_UM_US2):
+    """Rest-to-rest time in us for a constant-jerk move of `distance` um.
+
+    The profile peaks at 2x the mean speed and 8x distance / time^2 in
+    acceleration, so the slower of the two limits sets the duration.
+    """
+    if distance <= 0:
+        return 0.0
+    return float(max(2 * distance / speed, np.sqrt(8 * distance / accel)))
+
+
+def move_distance(shifts):
+    """Largest per-axis shift of a parallel move; AOD x and y tones sweep independently."""
+    shifts = np.atleast_2d(shifts)
+    return float(np.abs(shifts[:, :2]).max()) if shifts.size else 0.0
+
+
+class MotionModel:
+    """Animation timing for parallel moves from their displacement and the AOD limits."""
+
+    def __init__(self, max_speed=MAX_SPEED_UM_US, max_accel=MAX_ACCEL_UM_US2,
+                 um_per_unit=SITE_PITCH_UM, seconds_per_us=SECONDS_PER_US):
+        self.max_speed = max_speed
+        self.max_accel = max_accel
+        self.um_per_unit = um_per_unit
+        self.seconds_per_us = seconds_per_us
+
+    def timing(self, shifts):
+        """run_time, rate_func and physical duration_us for moving by `shifts` scene units."""
+        duration = move_time(move_distance(shifts) * self.um_per_unit, self.max_speed, self.max_accel)
+        return {
+            "run_time": max(duration * self.seconds_per_us, MIN_RUN_TIME),
+            "rate_func": constant_jerk,
+            "duration_us": duration,
+        }
+
+
+def step_duration(shifts, pitch=SITE_PITCH_UM, speed=MAX_SPEED_UM_US, transfer=TRANSFER_TIME_US):
+    distance = move_distance(shifts) * pitch
+    return 2 * transfer + move_time(distance, speed)
+
+
+def compile_moves(positions, atoms, targets, duration=step_duration):
+    """Compile atom moves into a short schedule of AOD-legal parallel steps.
+
+    positions: (n, 2) (row, col) site coordinates of every atom in the array.
+    atoms, targets: the atoms to move and their (k, 2) destinations, which
+    may be fractional (e.g. parked beside a partner atom).
+
+    Steps are filled greedily. A move joins a step when its row and column
+    tones agree with the tones already chosen, tones keep their order (no
+    crossings), no other atom sits at a picked row x col intersection, and
+    its destination is not held by an atom that stays put. Moves that can
+    never be placed, e.g. swap cycles without a buffer site, raise ValueError.
+    """
+    pos = np.array(positions, dtype=float)
+    atoms = np.asarray(atoms, dtype=int)
+    targets = np.asarray(targets, dtype=float).reshape(-1, 2)
+    pending = dict(zip(atoms.tolist(), targets))
+    steps = []
+
+    while pending:
+        rows, cols, members = {}, {}, []
+        # Positions only change once a step is chosen.
+        row_keys = np.array([_key(x) for x in pos[:, 0]])
+        col_keys = np.array([_key(x) for x in pos[:, 1]])
+        for atom, target in list(pending.items()):
+            if atom in members:
+                continue
+            dr, dc = target - pos[atom]
+            r, c = _key(pos[atom, 0]), _key(pos[atom, 1])
+            if r in rows and _key(rows[r]) != _key(dr) or c in cols and _key(cols[c]) != _key(dc):
+                continue
+            trial_rows = {**rows, r: dr}
+            trial_cols = {**cols, c: dc}
+            if not (_order_preserved(trial_rows) and _order_preserved(trial_cols)):
+                continue
+
+            picked = np.flatnonzero(np.isin(row_keys, list(trial_rows)) & np.isin(col_keys, list(trial_cols)))
+            ok = True
+            for b in picked.tolist():
+                shift = np.array([trial_rows[row_keys[b]], trial_cols[col_keys[b]]])
+                if b not in pending or not np.allclose(pos[b] + shift, pending[b]):
+                    ok = False
+                    break
+            if not ok:
+                continue
+
+            staying = np.setdiff1d(np.arange(len(pos)), picked)
+            dest = np.array([pending[b] for b in picked.tolist()])
+            if len(staying) and np.any(np.all(np.isclose(pos[staying][None], dest[:, None]), axis=2)):
+                continue
+            rows, cols, members = trial_rows, trial_cols, picked.tolist()
+
+        if not members:
+            raise ValueError(f"{len(pending)} moves are blocked; swap cycles need a free buffer site")
+        moved = np.array(members)
+        shifts = np.array([pending[b] for b in members]) - pos[moved]
+        steps.append(AODStep(moved, shifts, rows, cols, duration(shifts)))
+        pos[moved] += shifts
+        for b in members:
+            del pending[b]
+
+    return AODSchedule(steps)
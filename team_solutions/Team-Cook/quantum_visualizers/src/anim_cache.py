@@ -0,0 +1,269 @@
+"""Content-addressed partial movies that survive rebuilt mobjects.
+
+Manim keys each play's partial movie by a hash that changes whenever new
+mobject objects are built (update_caption, the demos), even when the frames
+would be identical. AnimationCacheMixin keys plays by their structure
+instead: camera and output settings, the animations' types and parameters,
+and the render state (points, colours, stroke, z-index, updaters) of every
+mobject family involved. Object identity never enters the key.
+
+Keyed partial movies are also kept in a shared store under CACHE_DIR, so a
+hit works across scene subclasses (checkpoint, farm variants) and renders.
+The store evicts least recently used files beyond anim_cache_bytes.
+
+Plays holding something the key cannot describe fall back to Manim's own
+hash, and are never stored.
+"""
+import dataclasses
+import functools
+import hashlib
+import os
+import shutil
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+from manim import Animation, ManimColor, Mobject, __version__ as manim_version, config
+from manim.renderer import cairo_renderer
+
+CACHE_DIR = Path("media") / "anim_cache"
+CACHE_BYTES = 2 << 30
+KEY_VERSION = 2
+DECIMALS = 6
+# Mobject state that reaches the frame; everything else on a mobject is ignored.
+RENDER_ATTRS = (
+    "points", "fill_rgbas", "stroke_rgbas", "background_stroke_rgbas",
+    "stroke_width", "background_stroke_width", "sheen_factor", "sheen_direction",
+    "joint_type", "cap_style", "z_index", "pixel_array", "updaters",
+)
+
+
+class _Unhashable(Exception):
+    pass
+
+
+class _Hasher:
+    """sha256 over a deterministic walk of plain values, arrays, functions, mobjects and animations."""
+    def __init__(self):
+        self.h = hashlib.sha256()
+        self.seen = {}
+
+    def put(self, tag, data=b""):
+        if isinstance(data, str):
+            data = data.encode()
+        self.h.update(tag.encode() + len(data).to_bytes(8, "little") + data)
+
+    def feed(self, value):
+        if value is None or isinstance(value, (bool, int, str)):
+            self.put(type(value).__name__, repr(value))
+        elif isinstance(value, float):
+            self.put("float", repr(round(value, DECIMALS) + 0.0))
+        elif isinstance(value, np.generic):
+            self.feed(value.item())
+        elif isinstance(value, np.ndarray) and value.dtype.names:
+            self.put("record", str(value.dtype.names))
+            for name in value.dtype.names:
+                self.feed(value[name])
+        elif isinstance(value, np.ndarray) and value.dtype.kind == "O":
+            self.put("objects", str(value.shape))
+            self.feed(value.ravel().tolist())
+        elif isinstance(value, np.ndarray):
+            if value.dtype.kind == "f":
+                value = np.round(value, DECIMALS) + 0.0
+            self.put("array", f"{value.dtype.str}{value.shape}")
+            self.put("data", np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, ManimColor):
+            self.put("color", value.to_hex(with_alpha=True))
+        elif isinstance(value, Enum):
+            self.put("enum", str(value))
+        elif isinstance(value, type):
+            self.put("type", f"{value.__module__}.{value.__qualname__}")
+        elif isinstance(value, bytes):
+            self.put("bytes", value)
+        elif isinstance(value, (set, frozenset)):
+            self.put("set", str(len(value)))
+            for item in sorted(value, key=repr):
+                self.feed(item)
+        elif isinstance(value, (list, tuple)):
+            self.put("seq", str(len(value)))
+            for item in value:
+                self.feed(item)
+        elif isinstance(value, dict):
+            self.put("dict", str(len(value)))
+            for key in sorted(value, key=repr):
+                self.feed(key)
+                self.feed(value[key])
+        elif isinstance(value, (Mobject, Animation)):
+            if id(value) in self.seen:
+                self.put("ref", str(self.seen[id(value)]))
+                return
+            self.seen[id(value)] = len(self.seen)
+            if isinstance(value, Mobject):
+                self.feed_mobject(value)
+            else:
+                self.feed_animation(value)
+        elif dataclasses.is_dataclass(value):
+            self.feed(type(value))
+            self.feed([getattr(value, f.name) for f in dataclasses.fields(value)])
+        elif isinstance(value, functools.partial):
+            self.put("partial")
+            self.feed([value.func, value.args, value.keywords])
+        elif callable(value):
+            self.feed_function(value)
+        else:
+            raise _Unhashable(type(value).__name__)
+
+    def feed_function(self, fn):
+        if hasattr(fn, "__self__") and hasattr(fn, "__func__"):
+            self.feed(fn.__self__)
+            fn = fn.__func__
+        code = getattr(fn, "__code__", None)
+        if code is None:
+            raise _Unhashable(type(fn).__name__)
+        self.put("function", f"{fn.__module__}.{fn.__qualname__}")
+        self.feed_code(code)
+        self.feed(fn.__defaults__)
+        for cell in fn.__closure__ or ():
+            try:
+                contents = cell.cell_contents
+            except ValueError:
+                raise _Unhashable("empty closure cell") from None
+            self.feed(contents)
+
+    def feed_code(self, code):
+        """Bytecode, names and constants, so editing a rate function or updater changes the key."""
+        self.put("code", code.co_code)
+        self.put("names", repr(code.co_names))
+        for const in code.co_consts:
+            if hasattr(const, "co_code"):
+                self.feed_code(const)
+            else:
+                self.feed(const)
+
+    def feed_mobject(self, mob):
+        self.put("mobject", type(mob).__qualname__)
+        for name in RENDER_ATTRS:
+            self.feed(getattr(mob, name, None))
+        self.put("submobjects", str(len(mob.submobjects)))
+        for sub in mob.submobjects:
+            self.feed(sub)
+
+    def feed_animation(self, anim):
+        self.put("animation", f"{type(anim).__module__}.{type(anim).__qualname__}")
+        self.feed(anim.run_time)
+        # Public parameters; private ones are run_time's backing field and no-op callbacks.
+        for name, value in sorted(vars(anim).items()):
+            if not name.startswith("_"):
+                self.put("attr", name)
+                self.feed(value)
+
+    def hexdigest(self):
+        return self.h.hexdigest()
+
+
+class AnimationCache:
+    """Directory of partial movies keyed by play key, bounded in total bytes."""
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key):
+        return self.directory / f"{key}{config.movie_file_extension}"
+
+    def fetch(self, key, dest):
+        """Place the stored movie for key at dest; False on a miss."""
+        src = self.path(key)
+        if not src.exists():
+            return False
+        if not dest.exists():
+            try:
+                os.link(src, dest)
+            except OSError:
+                shutil.copyfile(src, dest)
+        os.utime(src)
+        return True
+
+    def store(self, key, src):
+        dest = self.path(key)
+        if dest.exists() or not src.exists():
+            return
+        # Write under a private name first; farm workers share the store.
+        tmp = dest.with_name(f"{dest.name}.{os.getpid()}.tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self.directory.glob(f"*{config.movie_file_extension}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def _play_hash(scene, camera, animations, mobjects):
+    play_key = getattr(scene, "play_key", None)
+    key = play_key(camera, animations, mobjects) if play_key is not None else None
+    return key or _manim_play_hash(scene, camera, animations, mobjects)
+
+
+# The Cairo renderer looks the hash function up in its own module on every play.
+_manim_play_hash = getattr(cairo_renderer.get_hash_from_play_call, "manim_play_hash",
+                           cairo_renderer.get_hash_from_play_call)
+_play_hash.manim_play_hash = _manim_play_hash
+cairo_renderer.get_hash_from_play_call = _play_hash
+
+
+class AnimationCacheMixin:
+    """Scene mixin keying partial movies by play structure, backed by a shared store."""
+    anim_cache_dir = CACHE_DIR
+    anim_cache_bytes = CACHE_BYTES
+
+    def setup(self):
+        super().setup()
+        self.anim_cache = AnimationCache(self.anim_cache_dir, self.anim_cache_bytes)
+        self.play_keys = set()
+
+    def partial_movie_path(self, key):
+        directory = getattr(self.renderer.file_writer, "partial_movie_directory", None)
+        if directory is None:
+            return None
+        return Path(directory) / f"{key}{config.movie_file_extension}"
+
+    def play_key(self, camera, animations, mobjects):
+        """Structural key for a play, or None to use Manim's hash."""
+        hasher = _Hasher()
+        try:
+            hasher.feed([
+                KEY_VERSION, manim_version, config.pixel_width, config.pixel_height,
+                config.frame_rate, config.movie_file_extension, config.transparent,
+                camera.frame_width, camera.frame_height, camera.frame_center,
+                camera.background_color, camera.background_opacity,
+            ])
+            hasher.feed(list(animations))
+            hasher.feed(list(mobjects))
+        except _Unhashable:
+            return None
+        key = f"s{hasher.hexdigest()[:40]}"
+        partial = self.partial_movie_path(key)
+        if partial is not None:
+            self.anim_cache.fetch(key, partial)
+        self.play_keys.add(key)
+        return key
+
+    def play(self, *args, **kwargs):
+        super().play(*args, **kwargs)
+        hashes = self.renderer.animations_hashes
+        if hashes and hashes[-1] in self.play_keys:
+            partial = self.partial_movie_path(hashes[-1])
+            if partial is not None:
+                self.anim_cache.store(hashes[-1], partial)
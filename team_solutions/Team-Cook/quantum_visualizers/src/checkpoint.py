@@ -0,0 +1,169 @@
+"""Render a sectioned scene one section at a time, reusing unchanged sections.
+
+Each section gets a content key chained from the previous one, so editing a
+section invalidates it and everything after it, and nothing before it. The
+scene state at each section boundary is pickled under that key next to the
+section's movie; a re-render resumes from the last valid state.
+
+    python checkpoint.py SurfaceCodeCombined -o surface_code.mp4
+"""
+import argparse
+import hashlib
+import inspect
+import pickle
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from manim import config, logger
+
+import main
+
+CHECKPOINT_DIR = Path("media") / "checkpoints"
+FFMPEG = "ffmpeg"
+# Output settings that change a section's frames; movies from different settings never mix.
+RENDER_SETTINGS = (
+    "pixel_width", "pixel_height", "frame_rate", "frame_width", "frame_height",
+    "background_color", "transparent", "movie_file_extension",
+)
+
+
+def sibling_modules(module):
+    """Modules in module's directory that it imports, directly or through each other."""
+    here = Path(module.__file__).resolve().parent
+    found = {}
+    pending = [module]
+    while pending:
+        for value in vars(pending.pop()).values():
+            dep = value if inspect.ismodule(value) else sys.modules.get(getattr(value, "__module__", None) or "")
+            path = getattr(dep, "__file__", None)
+            if (dep is not None and dep is not module and dep.__name__ not in found
+                    and path and Path(path).resolve().parent == here):
+                found[dep.__name__] = dep
+                pending.append(dep)
+    return [found[name] for name in sorted(found)]
+
+
+def section_keys(scene_class, attrs=None):
+    """Return one chained content hash per entry of scene_class.sections.
+
+    The hashes cover the scene's module source and the sibling modules it
+    imports (lattice, decoder, motion, ...), the attribute overrides and the
+    current RENDER_SETTINGS.
+    """
+    module = sys.modules[scene_class.__module__]
+    section_srcs = [inspect.getsource(getattr(scene_class, name)) for name in scene_class.sections]
+    common = inspect.getsource(module)
+    for src in section_srcs:
+        common = common.replace(src, "")
+    for dep in sibling_modules(module):
+        common += f"\0{dep.__name__}\0{inspect.getsource(dep)}"
+    render = [config[name] for name in RENDER_SETTINGS]
+    params = repr([sorted((attrs or {}).items()), render])
+
+    keys = []
+    prev = hashlib.sha256(f"{scene_class.__name__}\0{params}\0{common}".encode()).hexdigest()
+    for name, src in zip(scene_class.sections, section_srcs):
+        prev = hashlib.sha256(f"{prev}\0{name}\0{src}".encode()).hexdigest()
+        keys.append(prev)
+    return keys
+
+
+class CheckpointMixin:
+    """Scene mixin that runs a single section between two pickled states.
+
+    Attributes set by construct() and the sections, plus scene.mobjects and
+    the background colour, make up the state. A missing start key means the
+    section starts from setup_canvas().
+    """
+    start_key = None
+    section_name = None
+    end_key = None
+
+    def setup(self):
+        super().setup()
+        self._base_attrs = set(vars(self)) | {"_base_attrs"}
+
+    def construct(self):
+        if self.start_key is None:
+            self.setup_canvas()
+        else:
+            self.load_state(CHECKPOINT_DIR / f"{self.start_key}.pkl")
+        self.run_section(self.section_name)
+        self.save_state(CHECKPOINT_DIR / f"{self.end_key}.pkl")
+
+    def save_state(self, path):
+        state = {k: v for k, v in vars(self).items() if k not in self._base_attrs}
+        state["mobjects"] = self.mobjects
+        state["background_color"] = self.camera.background_color
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load_state(self, path):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        self.camera.background_color = state.pop("background_color")
+        self.add(*state.pop("mobjects"))
+        vars(self).update(state)
+
+
+def render_section(scene_class, index, keys, attrs=None):
+    """Render section `index` from the previous checkpoint; return its movie path."""
+    name = scene_class.sections[index]
+    section_class = type(f"{scene_class.__name__}_{name}", (CheckpointMixin, scene_class), {
+        **(attrs or {}),
+        "start_key": keys[index - 1] if index > 0 else None,
+        "section_name": name,
+        "end_key": keys[index],
+    })
+    config.output_file = f"{scene_class.__name__}_{keys[index][:16]}"
+    scene = section_class()
+    scene.render()
+    movie = CHECKPOINT_DIR / f"{keys[index]}.mp4"
+    shutil.copy(scene.renderer.file_writer.movie_file_path, movie)
+    return movie
+
+
+def concat_movies(movies, output):
+    """Join section movies with the ffmpeg concat demuxer, without re-encoding."""
+    output = Path(output)
+    listing = output.with_suffix(".txt")
+    listing.write_text("".join(f"file '{Path(m).resolve()}'\n" for m in movies))
+    subprocess.run(
+        [FFMPEG, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+         "-i", str(listing), "-c", "copy", str(output)],
+        check=True,
+    )
+    listing.unlink()
+    return output
+
+
+def render_incremental(scene_class, output, attrs=None):
+    keys = section_keys(scene_class, attrs)
+    movies = [CHECKPOINT_DIR / f"{key}.mp4" for key in keys]
+    first_stale = next(
+        (i for i, key in enumerate(keys)
+         if not movies[i].exists() or not (CHECKPOINT_DIR / f"{key}.pkl").exists()),
+        len(keys),
+    )
+    for index in range(first_stale, len(keys)):
+        logger.info(f"rendering {scene_class.sections[index]}")
+        render_section(scene_class, index, keys, attrs)
+    return concat_movies(movies, output)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scene", nargs="?", default="SurfaceCodeCombined")
+    parser.add_argument("-o", "--output", default="surface_code.mp4")
+    parser.add_argument("--distance", type=int, help="override SurfaceCodeCombined.distance")
+    args = parser.parse_args(argv)
+
+    attrs = {"distance": args.distance} if args.distance is not None else {}
+    render_incremental(getattr(main, args.scene), args.output, attrs)
+
+
+if __name__ == "__main__":
+    main_cli()
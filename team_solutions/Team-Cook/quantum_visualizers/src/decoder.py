@@ -0,0 +1,256 @@
+"""Union-find decoder for the surface-code patch, with an optional matching decoder.
+
+The decoding graph has one node per (round, check) plus a shared boundary
+node. Space edges are data qubits; a qubit in a single check connects to the
+boundary. Time edges join a check to itself in the next round and stand for
+measurement errors. Decoders take the flattened detection events and return
+the data qubits to flip.
+
+    python decoder.py --distances 5 9 13 17 21 25 --rounds 25 -p 0.005 --shots 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from lattice import LatticeGeometry
+from syndrome import SyndromeBackend
+
+
+class DecodingGraph:
+    """Space-time graph of one check matrix repeated over `rounds` rounds."""
+    def __init__(self, h, rounds=1):
+        m, n = h.shape
+        self.num_checks = m
+        self.num_data = n
+        self.rounds = rounds
+        self.boundary = m * rounds
+
+        checks_of = [np.flatnonzero(h[:, q]) for q in range(n)]
+        u, v, qubit = [], [], []
+        for r in range(rounds):
+            for q, checks in enumerate(checks_of):
+                if len(checks) == 2:
+                    u.append(r * m + checks[0])
+                    v.append(r * m + checks[1])
+                elif len(checks) == 1:
+                    u.append(r * m + checks[0])
+                    v.append(self.boundary)
+                else:
+                    continue
+                qubit.append(q)
+            if r + 1 < rounds:
+                u += range(r * m, (r + 1) * m)
+                v += range((r + 1) * m, (r + 2) * m)
+                qubit += [-1] * m
+        self.u = np.array(u, dtype=np.int64)
+        self.v = np.array(v, dtype=np.int64)
+        self.qubit = np.array(qubit, dtype=np.int64)
+
+        ends = np.concatenate([self.u, self.v])
+        order = np.argsort(ends, kind="stable")
+        self.adj_edges = np.concatenate([np.arange(len(self.u))] * 2)[order].tolist()
+        self.adj_start = np.searchsorted(ends[order], np.arange(self.boundary + 2)).tolist()
+        self.u_list = self.u.tolist()
+        self.v_list = self.v.tolist()
+
+    def edges_at(self, node):
+        return self.adj_edges[self.adj_start[node]:self.adj_start[node + 1]]
+
+
+class UnionFindDecoder:
+    """Delfosse-Nickerson union-find decoder: grow odd clusters, then peel."""
+    def __init__(self, graph):
+        self.graph = graph
+
+    def decode(self, detections):
+        """Return (correction, edges): data-qubit flips and the chosen graph edges."""
+        g = self.graph
+        defects = np.flatnonzero(detections).tolist()
+        parent = {}
+        nodes_of = {}
+        frontier = {}
+        odd = {}
+        touches = {}
+        support = {}
+
+        def find(a):
+            root = a
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while a != root:
+                parent[a], a = root, parent[a]
+            return root
+
+        def cluster(a):
+            if a not in nodes_of:
+                nodes_of[a] = [a]
+                frontier[a] = [a] if a != g.boundary else []
+                odd[a] = False
+                touches[a] = a == g.boundary
+            return a
+
+        for d in defects:
+            cluster(d)
+            odd[d] = True
+        active = set(defects)
+
+        while active:
+            fused = []
+            for root in active:
+                for node in frontier[root]:
+                    for e in g.edges_at(node):
+                        s = support.get(e, 0)
+                        if s < 2:
+                            support[e] = s + 1
+                            if s == 1:
+                                fused.append(e)
+            for e in fused:
+                a = find(cluster(g.u_list[e]))
+                b = find(cluster(g.v_list[e]))
+                if a == b:
+                    continue
+                if len(nodes_of[a]) < len(nodes_of[b]):
+                    a, b = b, a
+                parent[b] = a
+                nodes_of[a] += nodes_of.pop(b)
+                frontier[a] += frontier.pop(b)
+                odd[a] ^= odd.pop(b)
+                touches[a] |= touches.pop(b)
+            roots = {find(r) for r in active}
+            active = set()
+            for root in roots:
+                frontier[root] = [
+                    node for node in frontier[root]
+                    if any(support.get(e, 0) < 2 for e in g.edges_at(node))
+                ]
+                if odd[root] and not touches[root]:
+                    active.add(root)
+
+        return self._peel(defects, [e for e, s in support.items() if s == 2])
+
+    def _peel(self, defects, erasure):
+        g = self.graph
+        adj = {}
+        for e in erasure:
+            a, b = g.u_list[e], g.v_list[e]
+            adj.setdefault(a, []).append((b, e))
+            adj.setdefault(b, []).append((a, e))
+
+        tree_edge = {}
+        order = []
+        seen = set()
+        starts = ([g.boundary] if g.boundary in adj else []) + list(adj)
+        for start in starts:
+            if start in seen:
+                continue
+            seen.add(start)
+            queue = [start]
+            for node in queue:
+                order.append(node)
+                for nbr, e in adj[node]:
+                    if nbr not in seen:
+                        seen.add(nbr)
+                        tree_edge[nbr] = (node, e)
+                        queue.append(nbr)
+
+        marked = set(defects)
+        chosen = []
+        for node in reversed(order):
+            if node in marked and node in tree_edge:
+                up, e = tree_edge[node]
+                chosen.append(e)
+                marked.discard(node)
+                marked ^= {up}
+
+        correction = np.zeros(g.num_data, dtype=np.uint8)
+        for e in chosen:
+            q = g.qubit[e]
+            if q >= 0:
+                correction[q] ^= 1
+        return correction, chosen
+
+
+class MatchingDecoder:
+    """Minimum-weight perfect matching on the same graph via the optional pymatching package."""
+    def __init__(self, graph):
+        try:
+            import pymatching
+        except ImportError as e:
+            raise ImportError("MatchingDecoder needs pymatching (pip install pymatching)") from e
+        self.graph = graph
+        self.matching = pymatching.Matching()
+        for a, b, q in zip(graph.u_list, graph.v_list, graph.qubit.tolist()):
+            faults = {q} if q >= 0 else set()
+            if b == graph.boundary:
+                self.matching.add_boundary_edge(a, fault_ids=faults)
+            else:
+                self.matching.add_edge(a, b, fault_ids=faults)
+
+    def decode(self, detections):
+        """Return (correction, None); matching does not expose its edge set."""
+        prediction = self.matching.decode(np.asarray(detections, dtype=np.uint8))
+        correction = np.zeros(self.graph.num_data, dtype=np.uint8)
+        k = min(len(prediction), self.graph.num_data)
+        correction[:k] = prediction[:k]
+        return correction, None
+
+
+def detection_events(syndromes):
+    """(rounds, M) measured syndromes -> flattened detection events (changes between rounds)."""
+    syndromes = np.asarray(syndromes, dtype=np.uint8)
+    return np.diff(syndromes, axis=0, prepend=0).astype(bool).astype(np.uint8).ravel()
+
+
+def sample_rounds(backend, p, rounds, rng):
+    """Bit flips of rate p per round and measurement flips of rate p except in the last round.
+
+    Returns (final x error, flattened detection events for the Z checks).
+    """
+    x = np.zeros(backend.num_data, dtype=np.uint8)
+    syndromes = []
+    for r in range(rounds):
+        x ^= (rng.random(backend.num_data) < p).astype(np.uint8)
+        z_synd, _ = backend.measure(x, np.zeros_like(x))
+        if r + 1 < rounds:
+            z_synd = z_synd ^ (rng.random(len(z_synd)) < p).astype(np.uint8)
+        syndromes.append(z_synd)
+    return x, detection_events(syndromes)
+
+
+def benchmark(distance, rounds, p, shots, decoder_class=UnionFindDecoder, seed=None):
+    """Decode `shots` memory experiments; return (seconds per shot, logical error rate)."""
+    backend = SyndromeBackend(LatticeGeometry(distance, distance, rotated=True))
+    decoder = decoder_class(DecodingGraph(backend.hz, rounds))
+    _, z_logical = backend.logicals()
+    rng = np.random.default_rng(seed)
+    failures = 0
+    elapsed = 0.0
+    for _ in range(shots):
+        x, detections = sample_rounds(backend, p, rounds, rng)
+        start = time.perf_counter()
+        correction, _ = decoder.decode(detections)
+        elapsed += time.perf_counter() - start
+        failures += int((x ^ correction) @ z_logical) & 1
+    return elapsed / shots, failures / shots
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--distances", type=int, nargs="+", default=[5, 9, 13, 17, 21, 25])
+    parser.add_argument("--rounds", type=int, help="rounds per shot (default: the distance)")
+    parser.add_argument("-p", type=float, default=0.005, help="bit-flip and measurement error rate")
+    parser.add_argument("--shots", type=int, default=200)
+    parser.add_argument("--matching", action="store_true", help="use pymatching instead of union-find")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    decoder_class = MatchingDecoder if args.matching else UnionFindDecoder
+    for d in args.distances:
+        rounds = args.rounds or d
+        per_shot, rate = benchmark(d, rounds, args.p, args.shots, decoder_class, args.seed)
+        print(f"d={d:3d} rounds={rounds:3d}  {per_shot * 1e3:8.2f} ms/shot  logical error rate {rate:.4f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,132 @@
+"""Render every variant of a parameter grid across a local process pool.
+
+The grid file (JSON, or YAML when PyYAML is installed) names a scene, a
+cartesian product of scene attributes and optional render settings:
+
+    {"scene": "SurfaceCodeCombined",
+     "grid": {"distance": [3, 5, 7], "bit_flip_error": [{"1,1": "X"}, {"0,2": "X"}],
+              "background_color": ["#1A1A2E", "#000000"]},
+     "resolution": [[1920, 1080], [1280, 720]], "fps": [60]}
+
+Pauli patterns (*_error, round_errors) use "row,col" keys as in record.py.
+Each variant's output is named by a hash of the scene source, its attributes
+and render settings, so unchanged variants are skipped. Workers are forked
+after a dry-run plan of the first variant, so they start with the text cache
+and compiled lattices warm and keep them across jobs.
+
+    python farm.py grid.json -j 8 -o renders
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from manim import config, logger
+
+import main
+from checkpoint import section_keys
+from plan import plan_scene
+from record import parse_paulis
+
+
+def load_grid(path):
+    with open(path) as f:
+        if str(path).endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("YAML grids need PyYAML (pip install pyyaml); use JSON otherwise") from e
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def scene_attrs(params):
+    """Grid values -> scene class attributes, parsing "row,col" Pauli patterns."""
+    attrs = {}
+    for key, value in params.items():
+        if key.endswith("_error"):
+            value = parse_paulis(value)
+        elif key == "round_errors":
+            value = {int(r): parse_paulis(pattern) for r, pattern in value.items()}
+        attrs[key] = value
+    return attrs
+
+
+def variants(grid):
+    """Yield (params, render settings) for every point of the grid."""
+    keys = list(grid.get("grid", {}))
+    resolutions = grid.get("resolution", [[config.pixel_width, config.pixel_height]])
+    rates = grid.get("fps", [config.frame_rate])
+    for values in itertools.product(*(grid["grid"][k] for k in keys)):
+        for (width, height), fps in itertools.product(resolutions, rates):
+            yield dict(zip(keys, values)), {"width": width, "height": height, "fps": fps}
+
+
+def variant_key(scene_name, params, settings):
+    scene_class = getattr(main, scene_name)
+    source_key = section_keys(scene_class, scene_attrs(params))[-1]
+    spec = json.dumps([scene_name, params, settings], sort_keys=True)
+    return hashlib.sha256(f"{source_key}\0{spec}".encode()).hexdigest()
+
+
+def render_variant(scene_name, params, settings, output):
+    config.dry_run = False
+    config.pixel_width = settings["width"]
+    config.pixel_height = settings["height"]
+    config.frame_rate = settings["fps"]
+    config.output_file = Path(output).stem
+    scene_class = getattr(main, scene_name)
+    # Manim keeps partial movies per scene class name; a unique name per job
+    # stops workers at the same resolution sharing that directory.
+    scene = type(config.output_file, (scene_class,), scene_attrs(params))()
+    scene.render()
+    shutil.copy(scene.renderer.file_writer.movie_file_path, output)
+    return output
+
+
+def warm_caches(scene_name, params):
+    """Dry-run one variant so cached_text and compiled_lattice are filled before forking."""
+    plan_scene(getattr(main, scene_name), **scene_attrs(params))
+    config.dry_run = False
+
+
+def render_farm(grid, output_dir, workers=None):
+    scene_name = grid.get("scene", "SurfaceCodeCombined")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    jobs = []
+    for params, settings in variants(grid):
+        output = output_dir / f"{scene_name}_{variant_key(scene_name, params, settings)[:16]}.mp4"
+        if output.exists():
+            logger.info(f"skip   {output.name}  {params} {settings}")
+        else:
+            jobs.append((params, settings, output))
+    if not jobs:
+        return []
+
+    warm_caches(scene_name, jobs[0][0])
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=context) as pool:
+        futures = [pool.submit(render_variant, scene_name, *job) for job in jobs]
+        for (params, settings, _), future in zip(jobs, futures):
+            logger.info(f"render {future.result().name}  {params} {settings}")
+    return [output for _, _, output in jobs]
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("grid", help="JSON or YAML parameter grid")
+    parser.add_argument("-o", "--output-dir", default="renders")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    render_farm(load_grid(args.grid), args.output_dir, args.jobs)
+
+
+if __name__ == "__main__":
+    main_cli()
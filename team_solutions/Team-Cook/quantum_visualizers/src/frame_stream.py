@@ -0,0 +1,135 @@
+"""Overlap rasterization and encoding by streaming frames into ffmpeg.
+
+Frames go through a bounded queue to a writer thread that feeds ffmpeg's
+stdin, so encoding runs while the next frames are rasterized. A full queue
+blocks the renderer (backpressure) instead of buffering without limit.
+
+    python frame_stream.py SurfaceCodeCombined -o surface_code.mp4 --queue-depth 32
+"""
+import argparse
+import queue
+import subprocess
+import threading
+
+from manim import config
+
+import main
+
+FFMPEG = "ffmpeg"
+
+
+class FFmpegPipe:
+    """Frame writer that encodes raw RGBA frames through ffmpeg's stdin."""
+    def __init__(self, path, width, height, fps, codec="libx264", pix_fmt="yuv420p"):
+        self.path = path
+        self.process = subprocess.Popen(
+            [FFMPEG, "-y", "-loglevel", "error",
+             "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(fps),
+             "-i", "-", "-an", "-c:v", codec, "-pix_fmt", pix_fmt, str(path)],
+            stdin=subprocess.PIPE,
+        )
+
+    def write(self, frame):
+        self.process.stdin.write(frame.tobytes())
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with {self.process.returncode} writing {self.path}")
+
+
+class FrameStream:
+    """Bounded producer/consumer queue in front of any object with write()/close().
+
+    put() blocks once `depth` frames are waiting. A writer error is re-raised
+    in the producer on the next put() or on close().
+    """
+    def __init__(self, writer, depth=32):
+        self.writer = writer
+        self.queue = queue.Queue(maxsize=depth)
+        self.error = None
+        self.thread = threading.Thread(target=self._drain, name="frame-stream", daemon=True)
+        self.thread.start()
+
+    def put(self, frame, repeat=1):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((frame, repeat))
+
+    def _drain(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue
+            frame, repeat = item
+            try:
+                for _ in range(repeat):
+                    self.writer.write(frame)
+            except Exception as e:
+                self.error = e
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.writer.close()
+        if self.error is not None:
+            raise self.error
+
+
+class StreamingMixin:
+    """Scene mixin that sends rendered frames to a FrameStream instead of partial movies.
+
+    Partial-movie caching and movie writing are turned off for the render,
+    since cached plays produce no frames, and restored afterwards. The
+    stream is closed even when construct() raises, so ffmpeg never keeps
+    waiting on an open pipe.
+    """
+    stream_output = "surface_code.mp4"
+    queue_depth = 32
+
+    def render(self, preview=False):
+        saved = config.disable_caching, config.write_to_movie
+        config.disable_caching = True
+        config.write_to_movie = False
+        self.frame_stream = None
+        try:
+            return super().render(preview)
+        finally:
+            config.disable_caching, config.write_to_movie = saved
+            if self.frame_stream is not None:
+                self.frame_stream.close()
+
+    def setup(self):
+        super().setup()
+        self.frame_stream = FrameStream(
+            FFmpegPipe(self.stream_output, config.pixel_width, config.pixel_height, config.frame_rate),
+            self.queue_depth,
+        )
+        self.renderer.add_frame = self.stream_frame
+
+    def stream_frame(self, frame, num_frames=1):
+        if self.renderer.skip_animations:
+            return
+        self.renderer.time += num_frames / config.frame_rate
+        self.frame_stream.put(frame, num_frames)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scene", nargs="?", default="SurfaceCodeCombined")
+    parser.add_argument("-o", "--output", default="surface_code.mp4")
+    parser.add_argument("--queue-depth", type=int, default=32)
+    parser.add_argument("--distance", type=int, help="override SurfaceCodeCombined.distance")
+    args = parser.parse_args(argv)
+
+    scene_class = getattr(main, args.scene)
+    attrs = {"stream_output": args.output, "queue_depth": args.queue_depth}
+    if args.distance is not None:
+        attrs["distance"] = args.distance
+    type(f"Streaming{args.scene}", (StreamingMixin, scene_class), attrs)().render()
+
+
+if __name__ == "__main__":
+    main_cli()
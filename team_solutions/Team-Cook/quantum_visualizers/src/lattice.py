@@ -0,0 +1,82 @@
+import numpy as np
+
+# CNOT order used by show_syndrome_extraction: NE, NW, SW, SE.
+DIAGONALS = np.array([[1, 1, 0], [-1, 1, 0], [-1, -1, 0], [1, -1, 0]], dtype=float)
+
+# Data-qubit (row, col) offset from a stabilizer's corner site for each diagonal.
+_DIAG_DR = np.array([0, 0, -1, -1])
+_DIAG_DC = np.array([0, -1, -1, 0])
+
+
+class LatticeGeometry:
+    """Surface-code patch layout as flat NumPy arrays.
+
+    Data qubits sit on a rows x cols grid and stabilizers on the corner sites
+    between them. ``z_nbrs``/``x_nbrs`` are (M, 4) data-index arrays ordered
+    like ``DIAGONALS`` and padded with -1 where a corner has no neighbour.
+
+    With ``rotated=False`` every corner site is kept (the original teaching
+    layout); ``rotated=True`` gives the standard rotated code, which drops the
+    corners and keeps only X boundaries on top/bottom and Z on left/right.
+    """
+
+    def __init__(self, rows, cols, spacing=0.75, center=(0, 0, 0), rotated=False):
+        self.rows = rows
+        self.cols = cols
+        self.spacing = spacing
+        self.center = np.asarray(center, dtype=float)
+        self.rotated = rotated
+
+        r, c = np.divmod(np.arange(rows * cols), cols)
+        self.data_rc = np.stack([r, c], axis=1)
+        self.data_pos = self._positions(c - (cols - 1) / 2, r - (rows - 1) / 2)
+
+        R, C = np.divmod(np.arange((rows + 1) * (cols + 1)), cols + 1)
+        nr = R[:, None] + _DIAG_DR
+        nc = C[:, None] + _DIAG_DC
+        valid = (nr >= 0) & (nr < rows) & (nc >= 0) & (nc < cols)
+        nbrs = np.where(valid, nr * cols + nc, -1)
+        is_z = (R + C) % 2 == 0
+
+        if rotated:
+            inner_r = (R > 0) & (R < rows)
+            inner_c = (C > 0) & (C < cols)
+            keep = (
+                (inner_r & inner_c)
+                | (~inner_r & inner_c & ~is_z)
+                | (inner_r & ~inner_c & is_z)
+            )
+        else:
+            keep = valid.any(axis=1)
+
+        site_pos = self._positions(C - cols / 2, R - rows / 2)
+        z_mask = keep & is_z
+        x_mask = keep & ~is_z
+        self.z_rc = np.stack([R[z_mask], C[z_mask]], axis=1)
+        self.x_rc = np.stack([R[x_mask], C[x_mask]], axis=1)
+        self.z_pos = site_pos[z_mask]
+        self.x_pos = site_pos[x_mask]
+        self.z_nbrs = nbrs[z_mask]
+        self.x_nbrs = nbrs[x_mask]
+
+    def _positions(self, x_units, y_units):
+        pos = np.zeros((len(x_units), 3))
+        pos[:, 0] = x_units * self.spacing
+        pos[:, 1] = y_units * self.spacing
+        return pos + self.center
+
+    def cnot_schedule(self, kind):
+        """Return the 4 CNOT layers of a stabilizer type as (stab_idx, data_idx) pairs.
+
+        Layer k pairs every stabilizer with its neighbour along DIAGONALS[k].
+        """
+        nbrs = self.z_nbrs if kind == "Z" else self.x_nbrs
+        layers = []
+        for k in range(len(DIAGONALS)):
+            stab_idx = np.flatnonzero(nbrs[:, k] >= 0)
+            layers.append((stab_idx, nbrs[stab_idx, k]))
+        return layers
+
+    @property
+    def num_data(self):
+        return self.rows * self.cols
@@ -1,11 +1,27 @@
+import json
+from collections import OrderedDict
+from functools import lru_cache, partial
+
 from manim import *
 import numpy as np
 
+from anim_cache import AnimationCacheMixin
+from decoder import DecodingGraph, UnionFindDecoder
+from lattice import LatticeGeometry
+from micro_batch import MicroBatchMixin
+from motion import MAX_ACCEL_UM_US2, MAX_SPEED_UM_US, SITE_PITCH_UM, MotionModel
+from record import RunRecord, parse_paulis
+from shotfile import ShotFile, stabilizer_order
+from static_layers import StaticLayerMixin
+from sweep import estimate_threshold
+from syndrome import ExtractionRounds, SyndromeBackend
+
 config.pixel_height = 1080
 config.pixel_width = 1920
 config.frame_height = 8.0 
 config.frame_width = 14.2
 DEFAULT_FONT = "sans-serif"
+LATTICE_EXTENT = 4.5
 
 YELLOW_DATA = "#F5C518"
 DARK_BLUE_Z = "#1E3A5F"
@@ -20,6 +36,23 @@ GRAY_TEXT = "#95A5A6"
 PURPLE = "#9B59B6"
 PURPLE_PHASE = "#9B59B6"
 
+TEXT_CACHE_SIZE = 256
+_text_cache = OrderedDict()
+
+
+def cached_text(text, font_size=24, font=DEFAULT_FONT, color=WHITE, weight=NORMAL):
+    """Return a copy of a prebuilt Text, building it at most once per LRU lifetime."""
+    key = (text, font, font_size, weight, str(color))
+    proto = _text_cache.get(key)
+    if proto is None:
+        proto = Text(text, font_size=font_size, font=font, color=color, weight=weight)
+        _text_cache[key] = proto
+        if len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+    else:
+        _text_cache.move_to_end(key)
+    return proto.copy()
+
 class DataQubit(VGroup):
     def __init__(self, position=ORIGIN, initial_state=0):
         super().__init__()
@@ -42,10 +75,9 @@ class DataQubit(VGroup):
             stroke_color=BLUE_STROKE
         ).move_to(position)
         
-        self.label = Text(
+        self.label = cached_text(
             "|0⟩" if self.state == 0 else "|1⟩", 
             font_size=24,
-            font=DEFAULT_FONT,
             color="#000000", 
             weight=BOLD
         ).move_to(position)
@@ -64,13 +96,13 @@ class DataQubit(VGroup):
         return self.core.get_center()
 
     def update_label(self):
-        return Text(
+        # Match the current label so qubits shrunk by make_data_qubit() keep their label size.
+        return cached_text(
             "|1⟩" if self.state == 1 else "|0⟩", 
             font_size=24,
-            font=DEFAULT_FONT,
             color="#000000", 
             weight=BOLD
-        ).move_to(self.core.get_center())
+        ).match_height(self.label).move_to(self.core.get_center())
 
 
 class StabilizerQubit(VGroup):
@@ -97,36 +129,305 @@ class StabilizerQubit(VGroup):
             stroke_color=BLUE_STROKE
         ).move_to(position)
         
-        self.label = Text(qubit_type, font_size=20, font=DEFAULT_FONT, color=WHITE, weight=BOLD).move_to(position)
+        self.label = cached_text(qubit_type, font_size=20, color=WHITE, weight=BOLD).move_to(position)
         self.add(self.glow, self.core, self.label)
     
     def get_center(self):
         return self.core.get_center()
 
-class SurfaceCodeCombined(Scene):
+@lru_cache(maxsize=32)
+def compiled_lattice(rows, cols, spacing, center, rotated):
+    """Geometry, syndrome backend and decoders for a layout, shared by every scene in the process."""
+    geometry = LatticeGeometry(rows, cols, spacing, center, rotated=rotated)
+    syndromes = SyndromeBackend(geometry)
+    return (
+        geometry,
+        syndromes,
+        UnionFindDecoder(DecodingGraph(syndromes.hz)),
+        UnionFindDecoder(DecodingGraph(syndromes.hx)),
+    )
+
+
+def make_data_qubit(position, state, scale=1.0):
+    return DataQubit(position, state).scale(scale)
+
+
+def make_stabilizer(position, state, qubit_type="Z", scale=1.0):
+    return StabilizerQubit(position, qubit_type).scale(scale)
+
+
+class QubitView:
+    """Handle to one qubit of a QubitField with the DataQubit/StabilizerQubit API.
+
+    Reading .core, .label or .highlight_ring detaches the qubit into a real
+    per-qubit mobject so it can be animated on its own.
+    """
+    def __init__(self, field, index):
+        self.field = field
+        self.index = index
+
+    @property
+    def mobject(self):
+        return self.field.detach(self.index)
+
+    @property
+    def core(self):
+        return self.mobject.core
+
+    @property
+    def label(self):
+        return self.mobject.label
+
+    @property
+    def highlight_ring(self):
+        return self.mobject.highlight_ring
+
+    @property
+    def state(self):
+        return int(self.field.states[self.index])
+
+    @state.setter
+    def state(self, value):
+        self.field.set_state(self.index, value)
+
+    def get_center(self):
+        return self.field.positions[self.index].copy()
+
+    def update_label(self):
+        return self.mobject.update_label()
+
+
+class QubitField(VGroup):
+    """A lattice of identical qubits backed by NumPy arrays.
+
+    Positions, states and highlight opacities live in flat arrays, and the
+    glow/ring/core/label parts of all attached qubits are each drawn as one
+    VMobject built from a per-qubit template. make_qubit(position, state)
+    builds the equivalent DataQubit/StabilizerQubit, used for templates and
+    for qubits detached through a QubitView.
+    """
+    part_names = ("glow", "highlight_ring", "core", "label")
+
+    def __init__(self, positions, make_qubit, **kwargs):
+        super().__init__(**kwargs)
+        self.make_qubit = make_qubit
+        self.positions = np.array(positions, dtype=float).reshape(-1, 3)
+        n = len(self.positions)
+        self.states = np.zeros(n, dtype=int)
+        self.highlight = np.zeros(n)
+        self.attached = np.ones(n, dtype=bool)
+        self.detached = {}
+        self.views = {}
+        self.ring_color = WHITE
+
+        proto = make_qubit(ORIGIN, 0)
+        self.templates = {}
+        self.layers = {}
+        for name in self.part_names:
+            part = getattr(proto, name, None)
+            if part is None:
+                continue
+            if name != "label":
+                self.templates[name] = self._template(part)
+            layer = VMobject()
+            layer.match_style(part.family_members_with_points()[0])
+            self.layers[name] = layer
+            self.add(layer)
+        if "label" in self.layers:
+            self.templates["label"] = {
+                state: self._template(make_qubit(ORIGIN, state).label) for state in (0, 1)
+            }
+        self._rebuild_points()
+
+    @staticmethod
+    def _template(part):
+        return np.concatenate([m.points for m in part.family_members_with_points()])
+
+    @property
+    def num_qubits(self):
+        return len(self.positions)
+
+    def qubit(self, index):
+        if index not in self.views:
+            self.views[index] = QubitView(self, index)
+        return self.views[index]
+
+    def _rebuild_points(self):
+        for name, layer in self.layers.items():
+            mask = self.attached.copy()
+            if name == "highlight_ring":
+                mask &= self.highlight > 0
+            if name == "label":
+                chunks = [
+                    (tmpl[None] + self.positions[mask & (self.states == state)][:, None]).reshape(-1, 3)
+                    for state, tmpl in self.templates["label"].items()
+                ]
+                layer.set_points(np.concatenate(chunks))
+            else:
+                tmpl = self.templates[name]
+                layer.set_points((tmpl[None] + self.positions[mask][:, None]).reshape(-1, 3))
+
+    def detach(self, index):
+        if index not in self.detached:
+            qubit = self.make_qubit(self.positions[index], int(self.states[index]))
+            for name in ("glow", "core"):
+                if name in self.layers:
+                    getattr(qubit, name).match_style(self.layers[name])
+            if "highlight_ring" in self.layers:
+                qubit.highlight_ring.set_stroke(color=self.ring_color, opacity=self.highlight[index])
+            self.detached[index] = qubit
+            self.attached[index] = False
+            self.add(qubit)
+            self._rebuild_points()
+        return self.detached[index]
+
+    def set_state(self, index, state):
+        self.states[index] = state
+        if index in self.detached:
+            self.detached[index].state = state
+        else:
+            self._rebuild_points()
+        return self
+
+    def set_positions(self, positions):
+        positions = np.array(positions, dtype=float).reshape(-1, 3)
+        for index, qubit in self.detached.items():
+            qubit.shift(positions[index] - self.positions[index])
+        self.positions = positions
+        self._rebuild_points()
+        return self
+
+    def set_highlight(self, indices, color, opacity=0.9):
+        self.highlight[:] = 0
+        self.highlight[indices] = opacity
+        self.ring_color = color
+        self.layers["highlight_ring"].set_stroke(color=color, opacity=opacity)
+        for index, qubit in self.detached.items():
+            qubit.highlight_ring.set_stroke(color=color, opacity=self.highlight[index])
+        self._rebuild_points()
+        return self
+
+    def clear_highlight(self):
+        return self.set_highlight([], self.ring_color, 0)
+
+    def set_core_style(self, color=None, stroke_color=None, stroke_width=None):
+        cores = [self.layers["core"], *[q.core for q in self.detached.values()]]
+        for core in cores:
+            if color is not None:
+                core.set_color(color)
+            if stroke_color is not None or stroke_width is not None:
+                core.set_stroke(color=stroke_color, width=stroke_width)
+        return self
+
+    def shift(self, *vectors):
+        super().shift(*vectors)
+        self.positions = self.positions + sum(vectors)
+        return self
+
+    def apply_points_function_about_point(self, func, about_point=None, about_edge=None):
+        if about_point is None:
+            about_point = self.get_critical_point(ORIGIN if about_edge is None else about_edge)
+        super().apply_points_function_about_point(func, about_point=about_point)
+        self.positions = func(self.positions - about_point) + about_point
+        return self
+
+    def interpolate(self, mobject1, mobject2, alpha, path_func=straight_path()):
+        super().interpolate(mobject1, mobject2, alpha, path_func)
+        if isinstance(mobject1, QubitField) and isinstance(mobject2, QubitField):
+            self.positions = path_func(mobject1.positions, mobject2.positions, alpha)
+        return self
+
+
+class SegmentSet(VMobject):
+    """Many straight segments drawn as a single path.
+
+    Endpoints live in one (N, 2, 3) array, so a whole CNOT layer is one
+    mobject that can be re-pointed in place with set_segments().
+    """
+    def __init__(self, segments=None, **kwargs):
+        super().__init__(**kwargs)
+        self.set_segments(np.zeros((0, 2, 3)) if segments is None else segments)
+
+    def set_segments(self, segments):
+        self.segments = np.asarray(segments, dtype=float).reshape(-1, 2, 3)
+        start = self.segments[:, 0, None, :]
+        end = self.segments[:, 1, None, :]
+        alphas = np.linspace(0, 1, 4)[None, :, None]
+        self.set_points((start + (end - start) * alphas).reshape(-1, 3))
+        return self
+
+
+class SurfaceCodeCombined(MicroBatchMixin, AnimationCacheMixin, StaticLayerMixin, Scene):
+    # Set distance to build a rotated d x d patch; otherwise the original
+    # lattice_rows x lattice_cols teaching layout is used.
+    distance = None
+    lattice_rows = 3
+    lattice_cols = 4
+    background_color = BG_COLOR
+    # Set to a motion.PROFILES name to time stabilizer shuttles physically,
+    # under these AOD limits (um/us and um/us^2).
+    motion_profile = None
+    motion_max_speed = MAX_SPEED_UM_US
+    motion_max_accel = MAX_ACCEL_UM_US2
+    # Pauli error patterns for the two demos, as {(row, col): "X" | "Y" | "Z"}.
+    bit_flip_error = {(1, 1): "X"}
+    phase_flip_error = {(1, 2): "Z"}
+    # Repeated extraction: total rounds, scripted {round: {(row, col): pauli}}
+    # errors and a depolarizing rate; only rounds with detection events are shown.
+    extraction_rounds = 1
+    round_errors = {}
+    round_error_rate = 0.0
+    round_seed = 0
+    # Or replay one shot of a shotfile.py recording instead of sampling rounds.
+    shot_file = None
+    shot_index = 0
+    sections = (
+        "intro", "show_legend", "build_lattice", "show_syndrome_extraction",
+        "explain_bit_flip", "bit_flip_demo", "explain_phase_flip", "phase_flip_demo",
+        "summary",
+    )
+
     def construct(self):
-        self.camera.background_color = BG_COLOR
+        self.setup_canvas()
+        for name in self.sections:
+            self.run_section(name)
+    
+    def setup_canvas(self):
+        self.camera.background_color = self.background_color
         
         self.caption_box = Rectangle(width=14, height=1.0, fill_color="#000000", fill_opacity=0.9, stroke_width=0).to_edge(DOWN, buff=0.1)
         self.add(self.caption_box)
         self.caption_text = Text("", font_size=18, color=WHITE).move_to(self.caption_box)
         self.add(self.caption_text)
-        
-        self.intro()
-        self.show_legend()
-        self.build_lattice()
-        self.show_syndrome_extraction()
-        self.explain_bit_flip()
-        self.bit_flip_demo()
-        self.explain_phase_flip()
-        self.phase_flip_demo()
-        self.summary()
+        self.caption = ""
     
+    def run_section(self, name):
+        self.next_section(name)
+        self.current_section = name
+        getattr(self, name)()
     
     def update_caption(self, text, color=WHITE):
-        new_caption = Text(text, font_size=24, font=DEFAULT_FONT, color=color).move_to(self.caption_box)
+        self.caption = text
+        new_caption = cached_text(text, font_size=24, color=color).move_to(self.caption_box)
         self.play(Transform(self.caption_text, new_caption), run_time=0.3)
     
+    def move_timing(self, displacements, run_time):
+        """play() kwargs for a shuttle: the fixed run_time, or the motion model's timing."""
+        if self.motion is None:
+            return {"run_time": run_time}
+        return self.motion.timing(displacements)
+
+    def chain_segments(self, decoder, chain, stabilizers):
+        """Stabilizer-to-data segments along the edges a decoder chose."""
+        g = decoder.graph
+        segments = []
+        for e in chain:
+            data_pos = self.geometry.data_pos[g.qubit[e]]
+            for node in (g.u_list[e], g.v_list[e]):
+                if node != g.boundary:
+                    segments.append((stabilizers.positions[node], data_pos))
+        return segments
+
     def create_circuit(self, center, circuit_type):
         color = DARK_BLUE_Z if circuit_type == "Z" else LIGHT_BLUE_X
         circuit = VGroup()
@@ -263,66 +564,57 @@ class SurfaceCodeCombined(Scene):
         self.play(FadeOut(title), FadeOut(data_row), FadeOut(z_row), FadeOut(x_row), run_time=0.8)
 
     def build_lattice(self):
-        self.update_caption("Building the Surface Code lattice (3x4 data qubits)", YELLOW_DATA)
-        
-        self.y_spacing = 0.75
-        self.y_rows = 3
-        self.y_cols = 4
+        if self.distance is not None:
+            rows = cols = self.distance
+        else:
+            rows, cols = self.lattice_rows, self.lattice_cols
+        self.update_caption(f"Building the Surface Code lattice ({rows}x{cols} data qubits)", YELLOW_DATA)
+        
+        self.y_spacing = min(0.75, LATTICE_EXTENT / max(rows, cols))
+        self.y_rows = rows
+        self.y_cols = cols
         self.lattice_center = UP * 1.2  
         self.half = self.y_spacing / 2
         
-        self.data_qubits = VGroup()
-        self.data_grid = {}
-        
-        for row in range(self.y_rows):
-            for col in range(self.y_cols):
-                x = (col - (self.y_cols-1)/2) * self.y_spacing
-                y = (row - (self.y_rows-1)/2) * self.y_spacing
-                pos = np.array([x, y, 0]) + self.lattice_center
-                qubit = DataQubit(position=pos, initial_state=0)
-                self.data_qubits.add(qubit)
-                self.data_grid[(row, col)] = qubit
-        
-        self.z_stabilizers = VGroup()
-        self.x_stabilizers = VGroup()
-        self.z_info = []
-        self.x_info = []
-        
-        for row in range(self.y_rows + 1):
-            for col in range(self.y_cols + 1):
-                x = (col - self.y_cols/2) * self.y_spacing
-                y = (row - self.y_rows/2) * self.y_spacing
-                pos = np.array([x, y, 0]) + self.lattice_center
-                
-                neighbors = []
-                if row > 0 and col > 0:
-                    neighbors.append(self.data_grid[(row-1, col-1)])
-                if row > 0 and col < self.y_cols:
-                    neighbors.append(self.data_grid[(row-1, col)])
-                if row < self.y_rows and col > 0:
-                    neighbors.append(self.data_grid[(row, col-1)])
-                if row < self.y_rows and col < self.y_cols:
-                    neighbors.append(self.data_grid[(row, col)])
-                
-                if len(neighbors) == 0:
-                    continue
-                
-                if (row + col) % 2 == 0:
-                    qubit = StabilizerQubit(position=pos, qubit_type="Z")
-                    self.z_stabilizers.add(qubit)
-                    self.z_info.append({"qubit": qubit, "home": pos.copy(), "neighbors": neighbors})
-                else:
-                    qubit = StabilizerQubit(position=pos, qubit_type="X")
-                    self.x_stabilizers.add(qubit)
-                    self.x_info.append({"qubit": qubit, "home": pos.copy(), "neighbors": neighbors})
-        
-        self.play(LaggedStart(*[FadeIn(q, scale=0.5) for q in self.data_qubits], lag_ratio=0.04), run_time=1.5)
+        self.geometry, self.syndromes, self.z_decoder, self.x_decoder = compiled_lattice(
+            rows, cols, self.y_spacing, tuple(self.lattice_center),
+            self.distance is not None
+        )
+        geo = self.geometry
+        qubit_scale = self.y_spacing / 0.75
+        
+        self.data_qubits = QubitField(geo.data_pos, partial(make_data_qubit, scale=qubit_scale))
+        self.data_grid = {tuple(rc): self.data_qubits.qubit(i) for i, rc in enumerate(geo.data_rc.tolist())}
+        
+        self.z_stabilizers = QubitField(geo.z_pos, partial(make_stabilizer, qubit_type="Z", scale=qubit_scale))
+        self.x_stabilizers = QubitField(geo.x_pos, partial(make_stabilizer, qubit_type="X", scale=qubit_scale))
+        
+        self.z_info = [
+            {"qubit": self.z_stabilizers.qubit(i), "home": pos.copy(),
+             "neighbors": [self.data_qubits.qubit(j) for j in nbrs if j >= 0]}
+            for i, (pos, nbrs) in enumerate(zip(geo.z_pos, geo.z_nbrs))
+        ]
+        self.x_info = [
+            {"qubit": self.x_stabilizers.qubit(i), "home": pos.copy(),
+             "neighbors": [self.data_qubits.qubit(j) for j in nbrs if j >= 0]}
+            for i, (pos, nbrs) in enumerate(zip(geo.x_pos, geo.x_nbrs))
+        ]
+        self.z_schedule = geo.cnot_schedule("Z")
+        self.x_schedule = geo.cnot_schedule("X")
+        self.motion = None
+        if self.motion_profile is not None:
+            self.motion = MotionModel(
+                self.motion_profile, self.motion_max_speed, self.motion_max_accel,
+                um_per_unit=SITE_PITCH_UM / self.y_spacing,
+            )
+        
+        self.play(FadeIn(self.data_qubits, scale=0.5), run_time=1.5)
         
         self.update_caption("Adding stabilizer qubits", LIGHT_BLUE_X)
         
         self.play(
-            LaggedStart(*[FadeIn(q, scale=0.5) for q in self.z_stabilizers], lag_ratio=0.03),
-            LaggedStart(*[FadeIn(q, scale=0.5) for q in self.x_stabilizers], lag_ratio=0.03),
+            FadeIn(self.z_stabilizers, scale=0.5),
+            FadeIn(self.x_stabilizers, scale=0.5),
             run_time=1.2
         )
         
@@ -363,96 +655,100 @@ class SurfaceCodeCombined(Scene):
 
         self.update_caption("X-stabilizers move to neighbors and ENTANGLE", LIGHT_BLUE_X)
         
+        entangle_lines = SegmentSet(color=LIGHT_BLUE_X, stroke_width=2, stroke_opacity=0.8)
         for idx, diag in enumerate(diagonals):
             move_dist = self.half * 0.5
             normalized_diag = diag / np.linalg.norm(diag)
             
-            move_x = [info["qubit"].animate.shift(normalized_diag * move_dist) for info in self.x_info]
-            self.play(*move_x, run_time=0.3)
-            
-            entangle_lines = VGroup()
-            for info in self.x_info:
-                pos = info["qubit"].get_center()
-                for neighbor in info["neighbors"]:
-                    y_pos = neighbor.get_center()
-                    if np.linalg.norm(pos - y_pos) < self.half * 0.85:
-                        neighbor.highlight_ring.set_stroke(color=LIGHT_BLUE_X, opacity=0.9)
-                        ent_line = Line(pos, y_pos, color=LIGHT_BLUE_X, stroke_width=2, stroke_opacity=0.8)
-                        entangle_lines.add(ent_line)
-            
-            self.play(Create(entangle_lines), run_time=0.15)
-            self.wait(0.08)
+            self.play(
+                self.x_stabilizers.animate.shift(normalized_diag * move_dist),
+                **self.move_timing(normalized_diag * move_dist, 0.3)
+            )
             
-            self.play(FadeOut(entangle_lines), run_time=0.1)
-            for dq in self.data_qubits:
-                dq.highlight_ring.set_stroke(opacity=0)
+            stab_idx, data_idx = self.x_schedule[idx]
+            stab_pos = self.geometry.x_pos[stab_idx] + normalized_diag * move_dist
+            data_pos = self.geometry.data_pos[data_idx]
+            self.data_qubits.set_highlight(data_idx, LIGHT_BLUE_X, 0.9)
+            entangle_lines.set_segments(np.stack([stab_pos, data_pos], axis=1))
             
-            return_x = [info["qubit"].animate.move_to(info["home"]) for info in self.x_info]
-            self.play(*return_x, run_time=0.2)
+            with self.micro_batch():
+                self.play(Create(entangle_lines), run_time=0.15)
+                self.wait(0.08)
+                self.play(FadeOut(entangle_lines), run_time=0.1)
+            self.data_qubits.clear_highlight()
             
             x_cnot = self.create_cnot(self.x_circuit_pos, idx)
-            self.play(Create(x_cnot), run_time=0.1)
+            with self.micro_batch():
+                self.play(
+                    self.x_stabilizers.animate.set_positions(self.geometry.x_pos),
+                    **self.move_timing(self.geometry.x_pos - self.x_stabilizers.positions, 0.2)
+                )
+                self.play(Create(x_cnot), run_time=0.1)
             self.x_circuit.add(x_cnot)
 
         self.update_caption("Shuttling to measurement zone", LIGHT_BLUE_X)
         
-        num_x = len(self.x_stabilizers)
+        num_x = self.x_stabilizers.num_qubits
         cols = 4
         x_positions = [
             self.x_measure_zone + RIGHT * (i % cols) * 0.4 + DOWN * (i // cols) * 0.4 
             for i in range(num_x)
         ]
-        move_anims = [self.x_stabilizers[i].animate.move_to(x_positions[i]) for i in range(num_x)]
-        self.play(*move_anims, run_time=0.7)
+        self.play(
+            self.x_stabilizers.animate.set_positions(x_positions),
+            **self.move_timing(np.array(x_positions) - self.x_stabilizers.positions, 0.7)
+        )
 
-        self.x_wait = Text("waiting", font_size=18, font=DEFAULT_FONT, color=GRAY_TEXT)
+        self.x_wait = cached_text("waiting", font_size=18, color=GRAY_TEXT)
         self.x_wait.next_to(self.x_measure_zone, UP, buff=0.3)
         self.play(FadeIn(self.x_wait), run_time=0.2)
 
         self.update_caption("Z-stabilizers move to neighbors and ENTANGLE", WHITE)
         
+        entangle_lines = SegmentSet(color=DARK_BLUE_Z, stroke_width=2, stroke_opacity=0.8)
         for idx, diag in enumerate(diagonals):
             move_dist = self.half * 0.5
             normalized_diag = diag / np.linalg.norm(diag)
             
-            move_z = [info["qubit"].animate.shift(normalized_diag * move_dist) for info in self.z_info]
-            self.play(*move_z, run_time=0.3)
-            
-            entangle_lines = VGroup()
-            for info in self.z_info:
-                pos = info["qubit"].get_center()
-                for neighbor in info["neighbors"]:
-                    y_pos = neighbor.get_center()
-                    if np.linalg.norm(pos - y_pos) < self.half * 0.85:
-                        neighbor.highlight_ring.set_stroke(color=DARK_BLUE_Z, opacity=0.9)
-                        ent_line = Line(pos, y_pos, color=DARK_BLUE_Z, stroke_width=2, stroke_opacity=0.8)
-                        entangle_lines.add(ent_line)
-            
-            self.play(Create(entangle_lines), run_time=0.15)
-            self.wait(0.08)
+            self.play(
+                self.z_stabilizers.animate.shift(normalized_diag * move_dist),
+                **self.move_timing(normalized_diag * move_dist, 0.3)
+            )
             
-            self.play(FadeOut(entangle_lines), run_time=0.1)
-            for dq in self.data_qubits:
-                dq.highlight_ring.set_stroke(opacity=0)
+            stab_idx, data_idx = self.z_schedule[idx]
+            stab_pos = self.geometry.z_pos[stab_idx] + normalized_diag * move_dist
+            data_pos = self.geometry.data_pos[data_idx]
+            self.data_qubits.set_highlight(data_idx, DARK_BLUE_Z, 0.9)
+            entangle_lines.set_segments(np.stack([stab_pos, data_pos], axis=1))
             
-            return_z = [info["qubit"].animate.move_to(info["home"]) for info in self.z_info]
-            self.play(*return_z, run_time=0.2)
+            with self.micro_batch():
+                self.play(Create(entangle_lines), run_time=0.15)
+                self.wait(0.08)
+                self.play(FadeOut(entangle_lines), run_time=0.1)
+            self.data_qubits.clear_highlight()
             
             z_cnot = self.create_cnot(self.z_circuit_pos, idx)
-            self.play(Create(z_cnot), run_time=0.1)
+            with self.micro_batch():
+                self.play(
+                    self.z_stabilizers.animate.set_positions(self.geometry.z_pos),
+                    **self.move_timing(self.geometry.z_pos - self.z_stabilizers.positions, 0.2)
+                )
+                self.play(Create(z_cnot), run_time=0.1)
             self.z_circuit.add(z_cnot)
 
         self.update_caption("Z-stabilizers shuttle to measurement zone", WHITE)
         
-        num_z = len(self.z_stabilizers)
+        num_z = self.z_stabilizers.num_qubits
         z_positions = [
             self.z_measure_zone + LEFT * (i % cols) * 0.4 + DOWN * (i // cols) * 0.4
             for i in range(num_z)
         ]
-        move_anims = [self.z_stabilizers[i].animate.move_to(z_positions[i]) for i in range(num_z)]
-        self.play(*move_anims, run_time=0.7)
+        self.play(
+            self.z_stabilizers.animate.set_positions(z_positions),
+            **self.move_timing(np.array(z_positions) - self.z_stabilizers.positions, 0.7)
+        )
 
-        self.z_wait = Text("waiting", font_size=18, font=DEFAULT_FONT, color=GRAY_TEXT)
+        self.z_wait = cached_text("waiting", font_size=18, color=GRAY_TEXT)
         self.z_wait.next_to(self.z_measure_zone, UP, buff=0.3)
         self.play(FadeIn(self.z_wait), run_time=0.2)
 
@@ -464,23 +760,27 @@ class SurfaceCodeCombined(Scene):
         self.x_m_box = x_m
         self.z_m_box = z_m
         
-        flash_anims = [x.core.animate.set_stroke(color=WHITE, width=5) for x in self.x_stabilizers]
-        flash_anims += [z.core.animate.set_stroke(color=WHITE, width=5) for z in self.z_stabilizers]
-        self.play(*flash_anims, run_time=0.25)
+        self.play(
+            self.x_stabilizers.animate.set_core_style(stroke_color=WHITE, stroke_width=5),
+            self.z_stabilizers.animate.set_core_style(stroke_color=WHITE, stroke_width=5),
+            run_time=0.25
+        )
         self.wait(0.2)
         
-        x_ready = Text("done!", font_size=18, font=DEFAULT_FONT, color=GREEN_OK).move_to(self.x_wait)
-        z_ready = Text("done!", font_size=18, font=DEFAULT_FONT, color=GREEN_OK).move_to(self.z_wait)
+        x_ready = cached_text("done!", font_size=18, color=GREEN_OK).move_to(self.x_wait)
+        z_ready = cached_text("done!", font_size=18, color=GREEN_OK).move_to(self.z_wait)
         
-        reset_anims = [x.core.animate.set_color(GREEN_OK).set_stroke(color=BLUE_STROKE, width=3) for x in self.x_stabilizers]
-        reset_anims += [z.core.animate.set_color(GREEN_OK).set_stroke(color=BLUE_STROKE, width=3) for z in self.z_stabilizers]
+        reset_anims = [
+            stabs.animate.set_core_style(color=GREEN_OK, stroke_color=BLUE_STROKE, stroke_width=3)
+            for stabs in (self.x_stabilizers, self.z_stabilizers)
+        ]
         
         self.play(*reset_anims, Transform(self.x_wait, x_ready), Transform(self.z_wait, z_ready), run_time=0.3)
 
-        self.x_result = Text("+1", font_size=24, font=DEFAULT_FONT, color=GREEN_OK, weight=BOLD)
+        self.x_result = cached_text("+1", font_size=24, color=GREEN_OK, weight=BOLD)
         self.x_result.next_to(self.x_circuit_label, DOWN, buff=0.1)
         
-        self.z_result = Text("+1", font_size=24, font=DEFAULT_FONT, color=GREEN_OK, weight=BOLD)
+        self.z_result = cached_text("+1", font_size=24, color=GREEN_OK, weight=BOLD)
         self.z_result.next_to(self.z_circuit_label, DOWN, buff=0.1)
         
         self.play(FadeIn(self.x_result), FadeIn(self.z_result), run_time=0.3)
@@ -490,16 +790,58 @@ class SurfaceCodeCombined(Scene):
 
         self.update_caption("Stabilizers return to lattice positions", WHITE)
         
-        return_x = [self.x_stabilizers[i].animate.move_to(self.x_info[i]["home"]) for i in range(len(self.x_info))]
-        reset_x = [x.core.animate.set_color(LIGHT_BLUE_X) for x in self.x_stabilizers]
-        self.play(*return_x, *reset_x, FadeOut(self.x_wait), run_time=0.7)
+        self.play(
+            self.x_stabilizers.animate.set_positions(self.geometry.x_pos).set_core_style(color=LIGHT_BLUE_X),
+            FadeOut(self.x_wait),
+            **self.move_timing(self.geometry.x_pos - self.x_stabilizers.positions, 0.7)
+        )
+        
+        self.play(
+            self.z_stabilizers.animate.set_positions(self.geometry.z_pos).set_core_style(color=DARK_BLUE_Z),
+            FadeOut(self.z_wait),
+            **self.move_timing(self.geometry.z_pos - self.z_stabilizers.positions, 0.7)
+        )
         
-        return_z = [self.z_stabilizers[i].animate.move_to(self.z_info[i]["home"]) for i in range(len(self.z_info))]
-        reset_z = [z.core.animate.set_color(DARK_BLUE_Z) for z in self.z_stabilizers]
-        self.play(*return_z, *reset_z, FadeOut(self.z_wait), run_time=0.7)
+        if self.extraction_rounds > 1 or self.shot_file is not None:
+            self.show_repeated_rounds()
         
         self.wait(1)
 
+    def show_repeated_rounds(self):
+        if self.shot_file is not None:
+            shots = ShotFile(self.shot_file)
+            if shots.stabilizers != stabilizer_order(self.geometry):
+                raise ValueError(f"{self.shot_file} was recorded on a different lattice")
+            rounds = shots.events(self.shot_index)
+        else:
+            rounds = ExtractionRounds(
+                self.syndromes, self.extraction_rounds, self.round_error_rate,
+                errors=self.round_errors, rng=self.round_seed
+            )
+        quiet = 0
+        for r, z_events, x_events in rounds:
+            z_idx = np.flatnonzero(z_events)
+            x_idx = np.flatnonzero(x_events)
+            if not len(z_idx) and not len(x_idx):
+                quiet += 1
+                continue
+            
+            skipped = f" ({quiet} quiet rounds skipped)" if quiet else ""
+            self.update_caption(f"Round {r + 1}: {len(z_idx) + len(x_idx)} detection events{skipped}", ORANGE_ALERT)
+            quiet = 0
+            
+            flagged = [self.z_stabilizers.qubit(i) for i in z_idx] + [self.x_stabilizers.qubit(i) for i in x_idx]
+            self.play(*[q.core.animate.set_color(ORANGE_ALERT) for q in flagged], run_time=0.3)
+            self.wait(0.5)
+            self.play(
+                *[q.core.animate.set_color(DARK_BLUE_Z) for q in flagged[:len(z_idx)]],
+                *[q.core.animate.set_color(LIGHT_BLUE_X) for q in flagged[len(z_idx):]],
+                run_time=0.3
+            )
+        
+        if quiet:
+            self.update_caption(f"{quiet} more rounds with no detection events skipped", WHITE)
+
     def explain_bit_flip(self):
         self.update_caption("", WHITE)
         
@@ -565,39 +907,47 @@ class SurfaceCodeCombined(Scene):
         self.update_caption("BIT-FLIP ERROR DEMONSTRATION", RED_ERROR)
         self.wait(0.5)
         
-        error_q = self.data_grid[(1, 1)]
+        x_bits, z_bits = self.syndromes.pauli(self.bit_flip_error)
+        z_synd, _ = self.syndromes.measure(x_bits, z_bits)
+        if not x_bits.any():
+            raise ValueError(f"bit_flip_error needs at least one X or Y error, got {self.bit_flip_error!r}")
+        error_qs = [self.data_qubits.qubit(i) for i in np.flatnonzero(x_bits)]
+        error_q = error_qs[0]
         
         self.update_caption("STEP 1: Bit-flip error hits this data qubit!", RED_ERROR)
-        pointing_arrow = Arrow(
-            error_q.get_center() + UP * 1.5,
-            error_q.get_center() + UP * 0.6,
-            color=RED_ERROR,
-            stroke_width=8,
-            tip_length=0.4
-        )
+        pointing_arrow = VGroup(*[
+            Arrow(q.get_center() + UP * 1.5, q.get_center() + UP * 0.6,
+                  color=RED_ERROR, stroke_width=8, tip_length=0.4)
+            for q in error_qs
+        ])
         arrow_label = Text(
             "ERROR HERE!",
             font_size=22,
             font=DEFAULT_FONT,
             color=RED_ERROR,
             weight=BOLD
-        ).next_to(pointing_arrow, UP, buff=0.15)
+        ).next_to(pointing_arrow[0], UP, buff=0.15)
 
         self.play(
-            GrowArrow(pointing_arrow),
+            *[GrowArrow(arrow) for arrow in pointing_arrow],
             FadeIn(arrow_label),
             run_time=0.5
         )
         
-        error_circle = Circle(radius=0.4, color=RED_ERROR, stroke_width=5, fill_opacity=0).move_to(error_q.get_center())
-        self.play(FadeIn(error_circle), error_q.core.animate.set_color(RED_ERROR), run_time=0.5)
-        
-        error_q.state = 1
-        new_label = error_q.update_label()
-        self.play(Transform(error_q.label, new_label), run_time=0.3)
+        error_circle = VGroup(*[
+            Circle(radius=0.4, color=RED_ERROR, stroke_width=5, fill_opacity=0).move_to(q.get_center())
+            for q in error_qs
+        ])
+        self.play(FadeIn(error_circle), *[q.core.animate.set_color(RED_ERROR) for q in error_qs], run_time=0.5)
+        
+        label_anims = []
+        for q in error_qs:
+            q.state = 1 - q.state
+            label_anims.append(Transform(q.label, q.update_label()))
+        self.play(*label_anims, run_time=0.3)
      
         error_text = Text("BIT-FLIP!", font_size=18, font=DEFAULT_FONT, color=RED_ERROR, weight=BOLD)
-        error_text.next_to(error_q, DOWN, buff=1)
+        error_text.next_to(error_q.mobject, DOWN, buff=1)
         self.play(FadeIn(error_text), run_time=0.3)
         self.wait(0.8)
         
@@ -608,52 +958,55 @@ class SurfaceCodeCombined(Scene):
             run_time=0.3
         )
         
-        affected_z = [i for i, info in enumerate(self.z_info) if error_q in info["neighbors"]]
+        affected_z = np.flatnonzero(z_synd)
         
         self.update_caption("STEP 2: Z-stabilizers measure parity of neighbors", WHITE)
         self.wait(0.5)
         
         result_labels = []
         
+        ok_lines = SegmentSet(color=GRAY_TEXT, stroke_width=2)
+        err_lines = SegmentSet(color=RED_ERROR, stroke_width=2)
+        connections = VGroup(ok_lines, err_lines)
         for idx in affected_z:
             z_stab = self.z_info[idx]["qubit"]
             
-            connections = VGroup()
-            for neighbor in self.z_info[idx]["neighbors"]:
-                line_color = RED_ERROR if neighbor == error_q else GRAY_TEXT
-                line = Line(z_stab.get_center(), neighbor.get_center(), color=line_color, stroke_width=2)
-                connections.add(line)
+            stab_pos = z_stab.get_center()
+            neighbors = self.z_info[idx]["neighbors"]
+            ok_lines.set_segments([(stab_pos, n.get_center()) for n in neighbors if n not in error_qs])
+            err_lines.set_segments([(stab_pos, n.get_center()) for n in neighbors if n in error_qs])
             
             self.play(Create(connections), run_time=0.2)
             
             z_stab.core.set_color(ORANGE_ALERT)
             
-            r_text = Text("-1", font_size=20, font=DEFAULT_FONT, color=ORANGE_ALERT, weight=BOLD)
-            odd_text = Text("(ODD)", font_size=14, font=DEFAULT_FONT, color=ORANGE_ALERT)
+            r_text = cached_text("-1", font_size=20, color=ORANGE_ALERT, weight=BOLD)
+            odd_text = cached_text("(ODD)", font_size=14, color=ORANGE_ALERT)
             result_grp = VGroup(r_text, odd_text).arrange(RIGHT, buff=0.08)
          
-            stab_pos = z_stab.get_center()
             if stab_pos[0] < 0: 
-                result_grp.next_to(z_stab, LEFT, buff=0.15)
+                result_grp.next_to(z_stab.mobject, LEFT, buff=0.15)
             else:  
-                result_grp.next_to(z_stab, RIGHT, buff=0.15)
+                result_grp.next_to(z_stab.mobject, RIGHT, buff=0.15)
             
             result_labels.append(result_grp)
             self.play(FadeIn(result_grp), run_time=0.2)
             
             self.play(FadeOut(connections), run_time=0.12)
         
-        new_z_result = Text("-1", font_size=24, font=DEFAULT_FONT, color=ORANGE_ALERT, weight=BOLD)
-        new_z_result.next_to(self.z_circuit_label, DOWN, buff=0.1)
-        self.play(Transform(self.z_result, new_z_result), run_time=0.3)
+        if len(affected_z):
+            new_z_result = cached_text("-1", font_size=24, color=ORANGE_ALERT, weight=BOLD)
+            new_z_result.next_to(self.z_circuit_label, DOWN, buff=0.1)
+            self.play(Transform(self.z_result, new_z_result), run_time=0.3)
         
         self.update_caption("STEP 3: Error at intersection of -1 stabilizers", ORANGE_ALERT)
         
-        lines = VGroup()
-        for idx in affected_z:
-            z_stab = self.z_info[idx]["qubit"]
-            line = Line(z_stab.get_center(), error_q.get_center(), color=RED_ERROR, stroke_width=3)
-            lines.add(line)
+        correction, chain = self.z_decoder.decode(z_synd)
+        fix_qs = [self.data_qubits.qubit(i) for i in np.flatnonzero(correction)]
+        lines = SegmentSet(
+            self.chain_segments(self.z_decoder, chain, self.z_stabilizers),
+            color=RED_ERROR, stroke_width=3
+        )
         
         self.play(Create(lines), run_time=0.5)
         self.wait(1.2)
@@ -662,38 +1015,41 @@ class SurfaceCodeCombined(Scene):
         
         self.update_caption("STEP 4: Apply X gate to fix the error", GREEN_OK)
         
-        fix_circle = Circle(radius=0.4, color=GREEN_OK, stroke_width=5, fill_opacity=0).move_to(error_q.get_center())
-        x_gate = Text("X", font_size=28, font=DEFAULT_FONT, color=GREEN_OK, weight=BOLD).move_to(error_q.get_center())
+        fix_circle = VGroup(*[
+            Circle(radius=0.4, color=GREEN_OK, stroke_width=5, fill_opacity=0).move_to(q.get_center())
+            for q in fix_qs
+        ])
+        x_gate = VGroup(*[
+            cached_text("X", font_size=28, color=GREEN_OK, weight=BOLD).move_to(q.get_center())
+            for q in fix_qs
+        ])
         
         self.play(FadeIn(fix_circle), FadeIn(x_gate), run_time=0.3)
         
-        error_q.state = 0
-        fixed_label = error_q.update_label()
+        fix_anims = [q.core.animate.set_color(YELLOW_DATA) for q in error_qs if q not in fix_qs]
+        for q in fix_qs:
+            q.state = 1 - q.state
+            fix_anims += [q.core.animate.set_color(YELLOW_DATA), Transform(q.label, q.update_label())]
         
         self.play(
-            error_q.core.animate.set_color(YELLOW_DATA),
-            Transform(error_q.label, fixed_label),
+            *fix_anims,
             FadeOut(fix_circle), FadeOut(x_gate), 
             run_time=0.5
         )
         
         self.update_caption("STEP 5: All stabilizers now show +1 - ERROR CORRECTED!", GREEN_OK)
         
-        for z in self.z_stabilizers:
-            z.core.set_color(GREEN_OK)
-        for x in self.x_stabilizers:
-            x.core.set_color(GREEN_OK)
+        self.z_stabilizers.set_core_style(color=GREEN_OK)
+        self.x_stabilizers.set_core_style(color=GREEN_OK)
         
-        ok_z_result = Text("+1", font_size=24, font=DEFAULT_FONT, color=GREEN_OK, weight=BOLD)
+        ok_z_result = cached_text("+1", font_size=24, color=GREEN_OK, weight=BOLD)
         ok_z_result.next_to(self.z_circuit_label, DOWN, buff=0.1)
         self.play(Transform(self.z_result, ok_z_result), run_time=0.3)
         
         self.wait(1.5)
         
-        for z in self.z_stabilizers:
-            z.core.set_color(DARK_BLUE_Z)
-        for x in self.x_stabilizers:
-            x.core.set_color(LIGHT_BLUE_X)
+        self.z_stabilizers.set_core_style(color=DARK_BLUE_Z)
+        self.x_stabilizers.set_core_style(color=LIGHT_BLUE_X)
 
     def explain_phase_flip(self):
         self.update_caption("", WHITE)
@@ -765,42 +1121,48 @@ class SurfaceCodeCombined(Scene):
         self.update_caption("PHASE-FLIP ERROR DEMONSTRATION", PURPLE)
         self.wait(0.5)
         
-        error_q = self.data_grid[(1, 2)]
+        x_bits, z_bits = self.syndromes.pauli(self.phase_flip_error)
+        _, x_synd = self.syndromes.measure(x_bits, z_bits)
+        if not z_bits.any():
+            raise ValueError(f"phase_flip_error needs at least one Z or Y error, got {self.phase_flip_error!r}")
+        error_qs = [self.data_qubits.qubit(i) for i in np.flatnonzero(z_bits)]
+        error_q = error_qs[0]
         
         self.update_caption("STEP 1: Phase-flip error hits this data qubit!", PURPLE)
      
-        pointing_arrow = Arrow(
-            error_q.get_center() + UP * 1.5,
-            error_q.get_center() + UP * 0.6,
-            color=PURPLE,
-            stroke_width=8,
-            tip_length=0.4
-        )
+        pointing_arrow = VGroup(*[
+            Arrow(q.get_center() + UP * 1.5, q.get_center() + UP * 0.6,
+                  color=PURPLE, stroke_width=8, tip_length=0.4)
+            for q in error_qs
+        ])
         arrow_label = Text(
             "PHASE ERROR!",
             font_size=22,
             font=DEFAULT_FONT,
             color=PURPLE,
             weight=BOLD
-        ).next_to(pointing_arrow, UP, buff=0.15)
+        ).next_to(pointing_arrow[0], UP, buff=0.15)
   
         self.play(
-            GrowArrow(pointing_arrow),
+            *[GrowArrow(arrow) for arrow in pointing_arrow],
             FadeIn(arrow_label),
             run_time=0.5
         )
         
-        error_circle = Circle(radius=0.4, color=PURPLE, stroke_width=5, fill_opacity=0).move_to(error_q.get_center())
+        error_circle = VGroup(*[
+            Circle(radius=0.4, color=PURPLE, stroke_width=5, fill_opacity=0).move_to(q.get_center())
+            for q in error_qs
+        ])
         self.play(
             FadeIn(error_circle), 
-            error_q.core.animate.set_color(PURPLE), 
+            *[q.core.animate.set_color(PURPLE) for q in error_qs], 
             run_time=0.5
         )
         
         error_text = Text("PHASE-FLIP!", font_size=18, font=DEFAULT_FONT, color=PURPLE, weight=BOLD)
-        error_text.next_to(error_q, DOWN, buff=1)
+        error_text.next_to(error_q.mobject, DOWN, buff=1)
         phase_label = Text("|+⟩ → |−⟩", font_size=20, font=DEFAULT_FONT, color=PURPLE)
-        phase_label.next_to(error_q, DOWN, buff=1.6)
+        phase_label.next_to(error_q.mobject, DOWN, buff=1.6)
         
         self.play(FadeIn(error_text), FadeIn(phase_label), run_time=0.3)
         self.wait(0.8)
@@ -812,50 +1174,53 @@ class SurfaceCodeCombined(Scene):
             run_time=0.3
         )
         
-        affected_x = [i for i, info in enumerate(self.x_info) if error_q in info["neighbors"]]
+        affected_x = np.flatnonzero(x_synd)
         
         self.update_caption("STEP 2: X-stabilizers measure phase parity", LIGHT_BLUE_X)
         
         result_labels = []
+        ok_lines = SegmentSet(color=GRAY_TEXT, stroke_width=2)
+        err_lines = SegmentSet(color=PURPLE, stroke_width=2)
+        connections = VGroup(ok_lines, err_lines)
         for idx in affected_x:
             x_stab = self.x_info[idx]["qubit"]
             
-            connections = VGroup()
-            for neighbor in self.x_info[idx]["neighbors"]:
-                line_color = PURPLE if neighbor == error_q else GRAY_TEXT
-                line = Line(x_stab.get_center(), neighbor.get_center(), color=line_color, stroke_width=2)
-                connections.add(line)
+            stab_pos = x_stab.get_center()
+            neighbors = self.x_info[idx]["neighbors"]
+            ok_lines.set_segments([(stab_pos, n.get_center()) for n in neighbors if n not in error_qs])
+            err_lines.set_segments([(stab_pos, n.get_center()) for n in neighbors if n in error_qs])
             
             self.play(Create(connections), run_time=0.2)
             
             x_stab.core.set_color(ORANGE_ALERT)
             
-            r_text = Text("-1", font_size=20, font=DEFAULT_FONT, color=ORANGE_ALERT, weight=BOLD)
-            odd_text = Text("(ODD)", font_size=14, font=DEFAULT_FONT, color=ORANGE_ALERT)
+            r_text = cached_text("-1", font_size=20, color=ORANGE_ALERT, weight=BOLD)
+            odd_text = cached_text("(ODD)", font_size=14, color=ORANGE_ALERT)
             result_grp = VGroup(r_text, odd_text).arrange(DOWN, buff=0.05)
             
-            stab_pos = x_stab.get_center()
             if stab_pos[0] < 0:
-                result_grp.next_to(x_stab, LEFT, buff=0.15)
+                result_grp.next_to(x_stab.mobject, LEFT, buff=0.15)
             else:
-                result_grp.next_to(x_stab, RIGHT, buff=0.15)
+                result_grp.next_to(x_stab.mobject, RIGHT, buff=0.15)
             
             result_labels.append(result_grp)
             self.play(FadeIn(result_grp), run_time=0.2)
             
             self.play(FadeOut(connections), run_time=0.12)
         
-        new_x_result = Text("-1", font_size=24, font=DEFAULT_FONT, color=ORANGE_ALERT, weight=BOLD)
-        new_x_result.next_to(self.x_circuit_label, DOWN, buff=0.1)
-        self.play(Transform(self.x_result, new_x_result), run_time=0.3)
+        if len(affected_x):
+            new_x_result = cached_text("-1", font_size=24, color=ORANGE_ALERT, weight=BOLD)
+            new_x_result.next_to(self.x_circuit_label, DOWN, buff=0.1)
+            self.play(Transform(self.x_result, new_x_result), run_time=0.3)
         
         self.update_caption("STEP 3: Error at intersection of -1 X-syndromes", ORANGE_ALERT)
         
-        lines = VGroup()
-        for idx in affected_x:
-            x_stab = self.x_info[idx]["qubit"]
-            line = Line(x_stab.get_center(), error_q.get_center(), color=PURPLE, stroke_width=3)
-            lines.add(line)
+        correction, chain = self.x_decoder.decode(x_synd)
+        fix_qs = [self.data_qubits.qubit(i) for i in np.flatnonzero(correction)]
+        lines = SegmentSet(
+            self.chain_segments(self.x_decoder, chain, self.x_stabilizers),
+            color=PURPLE, stroke_width=3
+        )
         
         self.play(Create(lines), run_time=0.5)
         self.wait(1.2)
@@ -864,33 +1229,35 @@ class SurfaceCodeCombined(Scene):
         
         self.update_caption("STEP 4: Apply Z gate to fix the phase error", GREEN_OK)
         
-        fix_circle = Circle(radius=0.4, color=GREEN_OK, stroke_width=5, fill_opacity=0).move_to(error_q.get_center())
-        z_gate = Text("Z", font_size=28, font=DEFAULT_FONT, color=GREEN_OK, weight=BOLD).move_to(error_q.get_center())
+        fix_circle = VGroup(*[
+            Circle(radius=0.4, color=GREEN_OK, stroke_width=5, fill_opacity=0).move_to(q.get_center())
+            for q in fix_qs
+        ])
+        z_gate = VGroup(*[
+            cached_text("Z", font_size=28, color=GREEN_OK, weight=BOLD).move_to(q.get_center())
+            for q in fix_qs
+        ])
         
         self.play(FadeIn(fix_circle), FadeIn(z_gate), run_time=0.3)
         self.play(
-            error_q.core.animate.set_color(YELLOW_DATA), 
+            *[q.core.animate.set_color(YELLOW_DATA) for q in error_qs], 
             FadeOut(fix_circle), FadeOut(z_gate), 
             run_time=0.5
         )
         
         self.update_caption("STEP 5: ERROR CORRECTED!", GREEN_OK)
         
-        for z in self.z_stabilizers:
-            z.core.set_color(GREEN_OK)
-        for x in self.x_stabilizers:
-            x.core.set_color(GREEN_OK)
+        self.z_stabilizers.set_core_style(color=GREEN_OK)
+        self.x_stabilizers.set_core_style(color=GREEN_OK)
         
-        ok_x_result = Text("+1", font_size=24, font=DEFAULT_FONT, color=GREEN_OK, weight=BOLD)
+        ok_x_result = cached_text("+1", font_size=24, color=GREEN_OK, weight=BOLD)
         ok_x_result.next_to(self.x_circuit_label, DOWN, buff=0.1)
         self.play(Transform(self.x_result, ok_x_result), run_time=0.3)
         
         self.wait(1.5)
         
-        for z in self.z_stabilizers:
-            z.core.set_color(DARK_BLUE_Z)
-        for x in self.x_stabilizers:
-            x.core.set_color(LIGHT_BLUE_X)
+        self.z_stabilizers.set_core_style(color=DARK_BLUE_Z)
+        self.x_stabilizers.set_core_style(color=LIGHT_BLUE_X)
 
     def summary(self):
         all_elements = VGroup(
@@ -935,4 +1302,157 @@ class SurfaceCodeCombined(Scene):
         ).move_to(DOWN * 2.5)
         
         self.play(FadeIn(insight_box), FadeIn(insight), run_time=0.6)
-        self.wait(5)
\ No newline at end of file
+        self.wait(5)
+
+
+class ThresholdPlot(Scene):
+    """Log-log logical vs physical error rate from a sweep.py JSON file."""
+    sweep_file = "sweep.json"
+    line_colors = (YELLOW_DATA, LIGHT_BLUE_X, GREEN_OK, ORANGE_ALERT, PURPLE, RED_ERROR)
+
+    def construct(self):
+        self.camera.background_color = BG_COLOR
+        with open(self.sweep_file) as f:
+            result = json.load(f)
+        rates = np.array(result["rates"])
+        logical = np.array(result["logical"])
+        floor = 0.5 / result["shots"]
+        observed = logical[logical > 0]
+        
+        x_lo = np.floor(np.log10(rates.min()))
+        x_hi = np.ceil(np.log10(rates.max()))
+        y_lo = np.floor(np.log10(max(floor, observed.min() if observed.size else floor)))
+        axes = Axes(
+            x_range=[x_lo, x_hi, 1], y_range=[y_lo, 0, 1],
+            x_length=9, y_length=5.5,
+            x_axis_config={"scaling": LogBase()},
+            y_axis_config={"scaling": LogBase()},
+            axis_config={"color": GRAY_TEXT},
+            tips=False,
+        ).shift(DOWN * 0.2)
+        
+        ticks = VGroup(
+            *[cached_text(f"1e{int(e)}", font_size=16, color=GRAY_TEXT).next_to(axes.c2p(10.0 ** e, 10.0 ** y_lo), DOWN)
+              for e in np.arange(x_lo, x_hi + 1)],
+            *[cached_text(f"1e{int(e)}", font_size=16, color=GRAY_TEXT).next_to(axes.c2p(10.0 ** x_lo, 10.0 ** e), LEFT)
+              for e in np.arange(y_lo, 1)],
+        )
+        x_label = cached_text("physical error rate p", font_size=22, color=WHITE).next_to(axes, DOWN, buff=0.6)
+        y_label = cached_text("logical error rate", font_size=22, color=WHITE).rotate(PI / 2).next_to(axes, LEFT, buff=0.8)
+        title = cached_text("Surface code threshold", font_size=40, color=YELLOW_DATA, weight=BOLD).to_edge(UP, buff=0.4)
+        
+        self.play(FadeIn(title), Create(axes), FadeIn(ticks), FadeIn(x_label), FadeIn(y_label), run_time=1)
+        
+        for i, (d, row) in enumerate(zip(result["distances"], logical)):
+            color = self.line_colors[i % len(self.line_colors)]
+            points = [axes.c2p(p, max(rate, floor)) for p, rate in zip(rates, row)]
+            curve = VMobject(color=color, stroke_width=4).set_points_as_corners(points)
+            dots = VGroup(*[Dot(point, radius=0.06, color=color) for point in points])
+            label = cached_text(f"d={d}", font_size=20, color=color).next_to(points[-1], RIGHT, buff=0.15)
+            self.play(Create(curve), FadeIn(dots), FadeIn(label), run_time=0.8)
+        
+        threshold = estimate_threshold(result)
+        if threshold is not None:
+            marker = DashedLine(
+                axes.c2p(threshold, 10.0 ** y_lo), axes.c2p(threshold, 1.0),
+                color=WHITE, stroke_width=2
+            )
+            note = cached_text(f"threshold ~ {threshold:.3f}", font_size=22, color=WHITE).next_to(marker, UP, buff=0.1)
+            self.play(Create(marker), FadeIn(note), run_time=0.8)
+        self.wait(2)
+
+
+class RecordPlayback(SurfaceCodeCombined):
+    """Builds the lattice of a record.py run and replays its events as they are read."""
+    record_file = "run.jsonl"
+    sections = ("build_lattice", "play_record")
+    pauli_colors = {"X": RED_ERROR, "Y": ORANGE_ALERT, "Z": PURPLE}
+
+    def setup_canvas(self):
+        super().setup_canvas()
+        record = RunRecord(self.record_file)
+        if record.rotated:
+            if record.rows != record.cols:
+                raise ValueError(f"{self.record_file}: rotated records must be square")
+            self.distance = record.rows
+        else:
+            self.lattice_rows, self.lattice_cols = record.rows, record.cols
+
+    def play_record(self):
+        self.error_x = np.zeros(self.geometry.num_data, dtype=np.uint8)
+        self.error_z = np.zeros(self.geometry.num_data, dtype=np.uint8)
+        flagged = {"Z": set(), "X": set()}
+        quiet = 0
+        for event in RunRecord(self.record_file).events():
+            if "errors" in event:
+                x, z = self.syndromes.pauli(parse_paulis(event["errors"]))
+                self.update_caption(f"Round {event['round'] + 1}: {int((x | z).sum())} new data errors", RED_ERROR)
+                self.apply_record_paulis(x, z)
+            elif "syndrome" in event:
+                now = {kind: set(event["syndrome"][kind]) for kind in ("Z", "X")}
+                changed = {kind: sorted(now[kind] ^ flagged[kind]) for kind in ("Z", "X")}
+                if not changed["Z"] and not changed["X"]:
+                    quiet += 1
+                    continue
+                skipped = f" ({quiet} quiet rounds skipped)" if quiet else ""
+                self.update_caption(
+                    f"Round {event['round'] + 1}: {len(now['Z']) + len(now['X'])} stabilizers read -1{skipped}",
+                    ORANGE_ALERT
+                )
+                quiet = 0
+                anims = []
+                for kind, field, base in (("Z", self.z_stabilizers, DARK_BLUE_Z), ("X", self.x_stabilizers, LIGHT_BLUE_X)):
+                    for i in changed[kind]:
+                        color = ORANGE_ALERT if i in now[kind] else base
+                        anims.append(field.qubit(i).core.animate.set_color(color))
+                self.play(*anims, run_time=0.3)
+                self.wait(0.3)
+                flagged = now
+            elif "correction" in event:
+                x, z = self.syndromes.pauli(parse_paulis(event["correction"]))
+                self.update_caption(f"Decoder applies {int((x | z).sum())} corrections", GREEN_OK)
+                fixes = [self.data_qubits.qubit(i) for i in np.flatnonzero(x | z)]
+                rings = VGroup(*[
+                    Circle(radius=0.4 * self.y_spacing / 0.75, color=GREEN_OK, stroke_width=5).move_to(q.get_center())
+                    for q in fixes
+                ])
+                if fixes:
+                    self.play(FadeIn(rings), run_time=0.3)
+                self.apply_record_paulis(x, z)
+                self.play(
+                    *([FadeOut(rings)] if fixes else []),
+                    self.z_stabilizers.animate.set_core_style(color=DARK_BLUE_Z),
+                    self.x_stabilizers.animate.set_core_style(color=LIGHT_BLUE_X),
+                    run_time=0.3
+                )
+                flagged = {"Z": set(), "X": set()}
+                self.update_caption(*self.record_outcome())
+        if quiet:
+            self.update_caption(f"{quiet} more rounds with no changes skipped", WHITE)
+        self.wait(1)
+
+    def record_outcome(self):
+        """Caption and color for the residual error left after a correction."""
+        if not (self.error_x.any() or self.error_z.any()):
+            return "Back to the code space: error corrected", GREEN_OK
+        x_logical, z_logical = self.syndromes.logicals()
+        flipped = (
+            z_logical is not None and int(self.error_x @ z_logical) % 2
+            or x_logical is not None and int(self.error_z @ x_logical) % 2
+        )
+        if flipped:
+            return "Residual error flips the logical qubit", RED_ERROR
+        return "Residual error is a stabilizer: corrected", GREEN_OK
+
+    def apply_record_paulis(self, x, z):
+        """Fold a Pauli pattern into the running data error and recolor the qubits it touched."""
+        self.error_x ^= x
+        self.error_z ^= z
+        names = {(1, 0): "X", (1, 1): "Y", (0, 1): "Z"}
+        anims = []
+        for i in np.flatnonzero(x | z):
+            pauli = names.get((int(self.error_x[i]), int(self.error_z[i])))
+            color = self.pauli_colors[pauli] if pauli else YELLOW_DATA
+            anims.append(self.data_qubits.qubit(i).core.animate.set_color(color))
+        if anims:
+            self.play(*anims, run_time=0.4)
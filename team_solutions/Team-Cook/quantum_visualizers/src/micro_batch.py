@@ -0,0 +1,80 @@
+"""Play runs of very short animations as one compound animation.
+
+A 0.1 s play renders only a handful of frames but still pays the full
+per-play setup: family extraction, starting-state copies, moving/static
+frame split. Inside `micro_batch()`, consecutive plays and waits no longer
+than MICRO_RUN_TIME are queued and played as one Succession.
+
+Each queued step keeps the frame count Manim would give it on its own: a
+play is padded with a Wait up to ceil(run_time * fps) frames, and a static
+wait is trimmed to int(duration * fps) frames, as freeze_current_frame()
+does. Every frame is then sampled at the same local time as with separate
+plays. Code inside the block must not mutate on-screen mobjects between
+queued plays, since those plays have not run yet. That is also why batching
+is opt-in rather than scene-wide: the scene mutates mobjects between plays
+(highlights, circuit.add) and those points must stay flush boundaries.
+
+The batch is played through self.play(). Planners stacked above this mixin
+(plan.py, parallel_render.py) record plays and waits themselves and never
+queue, so their timelines keep the scene's order.
+"""
+import math
+from contextlib import contextmanager
+
+from manim import AnimationGroup, Succession, Wait, config
+
+MICRO_RUN_TIME = 0.2
+
+
+class MicroBatchMixin:
+    """Scene mixin adding the micro_batch() context manager."""
+    def setup(self):
+        super().setup()
+        self.micro_queue = None
+
+    @contextmanager
+    def micro_batch(self):
+        self.micro_queue = []
+        try:
+            yield
+        finally:
+            self.flush_micro()
+            self.micro_queue = None
+
+    def flush_micro(self):
+        queued, self.micro_queue = self.micro_queue, None
+        try:
+            if queued:
+                self.play(Succession(*queued))
+        finally:
+            self.micro_queue = []
+
+    def queue_micro(self, step):
+        """Queue a play, padded with a Wait up to its whole number of frames."""
+        self.micro_queue.append(step)
+        pad = math.ceil(step.run_time * config.frame_rate - 1e-9) / config.frame_rate - step.run_time
+        if pad > 1e-9:
+            self.micro_queue.append(Wait(run_time=pad))
+
+    def play(self, *args, **kwargs):
+        if self.micro_queue is None:
+            return super().play(*args, **kwargs)
+        animations = self.compile_animations(*args, **kwargs)
+        step = animations[0] if len(animations) == 1 else AnimationGroup(*animations)
+        if step.run_time > MICRO_RUN_TIME:
+            self.flush_micro()
+            return super().play(step)
+        self.queue_micro(step)
+
+    def wait(self, duration=1.0, *args, **kwargs):
+        if self.micro_queue is None or duration > MICRO_RUN_TIME or args or kwargs:
+            if self.micro_queue:
+                self.flush_micro()
+            return super().wait(duration, *args, **kwargs)
+        if self.should_update_mobjects():
+            self.queue_micro(Wait(run_time=duration))
+            return
+        # A static wait is a frozen frame repeated int(duration * fps) times.
+        frames = int(duration * config.frame_rate)
+        if frames:
+            self.micro_queue.append(Wait(run_time=frames / config.frame_rate))
@@ -0,0 +1,83 @@
+"""Physical shuttle timing: run times and velocity profiles from real distances.
+
+Scene distances are converted to micrometres with `um_per_unit`. Each move
+gets the shortest duration its profile allows under the AOD speed and
+acceleration limits, and the model keeps a running total of physical time so
+a scene doubles as a rearrangement latency estimate.
+"""
+import numpy as np
+
+SITE_PITCH_UM = 5.0          # data-qubit pitch that one lattice spacing stands for
+MAX_SPEED_UM_US = 0.55       # AOD sweep speed
+MAX_ACCEL_UM_US2 = 2.75e-3   # AOD acceleration limit (2750 m/s^2)
+SECONDS_PER_US = 2e-3        # animation seconds per physical microsecond
+MIN_RUN_TIME = 0.05
+
+
+def constant_jerk(t):
+    """S-curve with piecewise constant jerk: triangular acceleration, no cruise."""
+    if t > 0.5:
+        return 1 - constant_jerk(1 - t)
+    if t <= 0.25:
+        return 16 / 3 * t ** 3
+    u = 0.5 - t
+    return 0.5 - 2 * u + 16 / 3 * u ** 3
+
+
+def sine_ramp(t):
+    """Sine-squared velocity profile."""
+    return t - np.sin(2 * np.pi * t) / (2 * np.pi)
+
+
+# rate function, peak speed and peak acceleration for a unit move in unit time
+PROFILES = {
+    "constant_jerk": (constant_jerk, 2.0, 8.0),
+    "sine": (sine_ramp, 2.0, 2 * np.pi),
+}
+
+
+def move_time(distance, speed=MAX_SPEED_UM_US, accel=MAX_ACCEL_UM_US2, profile="constant_jerk"):
+    """Shortest rest-to-rest time in us to cover `distance` um; the slower limit wins."""
+    if distance <= 0:
+        return 0.0
+    _, peak_speed, peak_accel = PROFILES[profile]
+    return float(max(peak_speed * distance / speed, np.sqrt(peak_accel * distance / accel)))
+
+
+def move_distance(displacements):
+    """Distance that sets a parallel move's time: the largest per-axis shift.
+
+    AOD x and y tones sweep independently, so a diagonal move takes as long
+    as its longer axis.
+    """
+    displacements = np.atleast_2d(displacements)
+    return float(np.abs(displacements[:, :2]).max()) if displacements.size else 0.0
+
+
+class MotionModel:
+    """Times parallel moves from their displacement; the longest one sets the pace."""
+    def __init__(self, profile="constant_jerk", max_speed=MAX_SPEED_UM_US, max_accel=MAX_ACCEL_UM_US2,
+                 um_per_unit=SITE_PITCH_UM, seconds_per_us=SECONDS_PER_US):
+        self.profile = profile
+        self.rate_func = PROFILES[profile][0]
+        self.max_speed = max_speed
+        self.max_accel = max_accel
+        self.um_per_unit = um_per_unit
+        self.seconds_per_us = seconds_per_us
+        self.total_time = 0.0
+        self.moves = 0
+
+    def duration(self, distance):
+        """Shortest time in us to cover `distance` um from rest to rest."""
+        return move_time(distance, self.max_speed, self.max_accel, self.profile)
+
+    def timing(self, displacements):
+        """Return play() kwargs for moving by `displacements` and add it to the total."""
+        distance = move_distance(displacements) * self.um_per_unit
+        duration = self.duration(distance)
+        self.total_time += duration
+        self.moves += 1
+        return {
+            "run_time": float(max(duration * self.seconds_per_us, MIN_RUN_TIME)),
+            "rate_func": self.rate_func,
+        }
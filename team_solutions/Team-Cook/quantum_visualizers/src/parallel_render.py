@@ -0,0 +1,133 @@
+"""Render every section of a scene in parallel and stitch them losslessly.
+
+Each worker fast-forwards through the earlier sections in plan mode (end
+states only, no frames) to rebuild its starting state, then renders its own
+section. Section movies are keyed like checkpoint.py and concatenated with
+stream copy, so the result matches a serial render frame for frame.
+
+Parallelism is one worker per stale section, so SurfaceCodeCombined uses at
+most len(sections) (nine) cores however many are available. Splitting a
+section by play range would lift the cap, but play boundaries do not line
+up between plan mode and micro-batched rendering, so sections stay whole.
+
+    python parallel_render.py SurfaceCodeCombined -j 9 -o surface_code.mp4
+
+--verify also renders the scene serially and compares the two movies frame
+by frame (decoded-frame MD5s), failing on the first difference.
+
+    python parallel_render.py SurfaceCodeCombined -j 9 --verify
+"""
+import argparse
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from manim import config, logger
+
+import main
+from checkpoint import CHECKPOINT_DIR, FFMPEG, concat_movies, section_keys
+from plan import PlanMixin
+
+
+class SectionRenderMixin(PlanMixin):
+    """Plan through the sections before section_name, then render it for real."""
+    section_name = None
+
+    def construct(self):
+        self.planning = True
+        self.setup_canvas()
+        for name in self.sections:
+            if name == self.section_name:
+                break
+            self.run_section(name)
+        self.planning = False
+        self.run_section(self.section_name)
+
+    def play(self, *args, **kwargs):
+        if self.planning:
+            return super().play(*args, **kwargs)
+        return super(PlanMixin, self).play(*args, **kwargs)
+
+    def wait(self, *args, **kwargs):
+        if self.planning:
+            return super().wait(*args, **kwargs)
+        return super(PlanMixin, self).wait(*args, **kwargs)
+
+
+def render_section(scene_name, index, key, attrs=None):
+    scene_class = getattr(main, scene_name)
+    name = scene_class.sections[index]
+    section_class = type(f"{scene_name}_{name}", (SectionRenderMixin, scene_class), {
+        **(attrs or {}),
+        "section_name": name,
+    })
+    config.output_file = f"{scene_name}_{key[:16]}"
+    scene = section_class()
+    scene.render()
+    movie = CHECKPOINT_DIR / f"{key}.mp4"
+    movie.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(scene.renderer.file_writer.movie_file_path, movie)
+    return movie
+
+
+def render_parallel(scene_name, output, attrs=None, workers=None):
+    scene_class = getattr(main, scene_name)
+    keys = section_keys(scene_class, attrs)
+    movies = [CHECKPOINT_DIR / f"{key}.mp4" for key in keys]
+    stale = [i for i, movie in enumerate(movies) if not movie.exists()]
+    if not stale:
+        return concat_movies(movies, output)
+    # One job per section: more workers than stale sections would sit idle.
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(stale))) as pool:
+        futures = [pool.submit(render_section, scene_name, i, keys[i], attrs) for i in stale]
+        for future in futures:
+            future.result()
+    return concat_movies(movies, output)
+
+
+def frame_hashes(movie):
+    """MD5 of every decoded video frame of movie, in order."""
+    out = subprocess.run(
+        [FFMPEG, "-loglevel", "error", "-i", str(movie), "-map", "0:v", "-f", "framemd5", "-"],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return [line.rsplit(",", 1)[-1].strip() for line in out.splitlines() if line and not line.startswith("#")]
+
+
+def verify_serial(scene_name, movie, attrs=None):
+    """Render scene_name serially and raise if its frames differ from movie's."""
+    scene_class = getattr(main, scene_name)
+    config.output_file = f"{scene_name}_serial"
+    scene = type(f"{scene_name}Serial", (scene_class,), dict(attrs or {}))()
+    scene.render()
+    expected = frame_hashes(scene.renderer.file_writer.movie_file_path)
+    actual = frame_hashes(movie)
+    mismatch = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), None)
+    if mismatch is None and len(expected) != len(actual):
+        mismatch = min(len(expected), len(actual))
+    if mismatch is not None:
+        raise RuntimeError(
+            f"{movie} differs from the serial render at frame {mismatch} "
+            f"({len(actual)} frames vs {len(expected)})"
+        )
+    logger.info(f"{movie} matches the serial render ({len(actual)} frames)")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scene", nargs="?", default="SurfaceCodeCombined")
+    parser.add_argument("-o", "--output", default="surface_code.mp4")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--distance", type=int, help="override SurfaceCodeCombined.distance")
+    parser.add_argument("--verify", action="store_true", help="compare frames against a serial render")
+    args = parser.parse_args(argv)
+
+    attrs = {"distance": args.distance} if args.distance is not None else {}
+    output = render_parallel(args.scene, args.output, attrs, args.jobs)
+    if args.verify:
+        verify_serial(args.scene, output, attrs)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,114 @@
+"""Dry-run a scene into a JSON timeline without rendering a single frame.
+
+    python plan.py SurfaceCodeCombined -o timeline.json
+"""
+import argparse
+import json
+import sys
+
+from manim import Wait, config
+
+import main
+from motion import PROFILES
+
+
+class PlanMixin:
+    """Scene mixin that applies every animation's end state instead of rendering it.
+
+    Each play()/wait() appends one timeline entry with the section and caption
+    active at the time, the animation types, how many mobjects they touch and
+    their start/end time in the finished video. Scenes with a motion model
+    also record the physical schedule time accumulated so far.
+    """
+    def setup(self):
+        super().setup()
+        self.timeline = []
+        self.plan_time = 0.0
+        self.current_section = None
+        self.caption = ""
+
+    def next_section(self, name="unnamed", *args, **kwargs):
+        self.current_section = name
+
+    def wait(self, duration=1.0, *args, **kwargs):
+        # Recorded straight away, so waits inside micro_batch() keep their place in the timeline.
+        self.play(Wait(run_time=duration))
+
+    def play(self, *args, subcaptions=None, subcaption_duration=None, subcaption_offset=0, **kwargs):
+        animations = self.compile_animations(*args, **kwargs)
+        self.add_mobjects_from_animations(animations)
+        run_time = self.get_run_time(animations)
+        for anim in animations:
+            anim._setup_scene(self)
+            anim.begin()
+        for anim in animations:
+            anim.finish()
+            anim.clean_up_from_scene(self)
+        entry = {
+            "section": self.current_section,
+            "caption": self.caption,
+            "animations": [type(anim).__name__ for anim in animations],
+            "mobjects": sum(len(anim.mobject.family_members_with_points()) for anim in animations),
+            "start": round(self.plan_time, 6),
+            "end": round(self.plan_time + run_time, 6),
+        }
+        if getattr(self, "motion", None) is not None:
+            entry["physical_us"] = round(self.motion.total_time, 3)
+        self.timeline.append(entry)
+        self.plan_time += run_time
+
+
+def plan_scene(scene_class, **attrs):
+    """Run scene_class.construct() under PlanMixin and return its timeline."""
+    config.dry_run = True
+    plan_class = type(f"Plan{scene_class.__name__}", (PlanMixin, scene_class), attrs)
+    scene = plan_class()
+    scene.setup()
+    scene.construct()
+    return scene.timeline
+
+
+def summarize(timeline):
+    sections = {}
+    for entry in timeline:
+        totals = sections.setdefault(entry["section"], {"start": entry["start"], "end": entry["end"], "plays": 0})
+        totals["end"] = entry["end"]
+        totals["plays"] += 1
+    return {
+        "duration": timeline[-1]["end"] if timeline else 0.0,
+        "physical_us": max((entry.get("physical_us", 0.0) for entry in timeline), default=0.0),
+        "plays": len(timeline),
+        "animations": sum(len(entry["animations"]) for entry in timeline),
+        "sections": sections,
+    }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scene", nargs="?", default="SurfaceCodeCombined")
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    parser.add_argument("--distance", type=int, help="override SurfaceCodeCombined.distance")
+    parser.add_argument("--motion", choices=sorted(PROFILES),
+                        help="time shuttles with this velocity profile and report physical time")
+    parser.add_argument("--max-speed", type=float, help="AOD speed limit in um/us (with --motion)")
+    parser.add_argument("--max-accel", type=float, help="AOD acceleration limit in um/us^2 (with --motion)")
+    args = parser.parse_args(argv)
+
+    attrs = {"distance": args.distance} if args.distance is not None else {}
+    if args.motion is not None:
+        attrs["motion_profile"] = args.motion
+    if args.max_speed is not None:
+        attrs["motion_max_speed"] = args.max_speed
+    if args.max_accel is not None:
+        attrs["motion_max_accel"] = args.max_accel
+    timeline = plan_scene(getattr(main, args.scene), **attrs)
+    report = json.dumps({"summary": summarize(timeline), "timeline": timeline}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        sys.stdout.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,98 @@
+"""Recorded runs: JSON Lines logs of errors, syndromes and corrections.
+
+The first line is a header, e.g. {"rows": 5, "cols": 5, "rotated": true}.
+Every following line is one event:
+
+    {"round": 0, "errors": {"1,1": "X"}}          data errors that appeared
+    {"round": 0, "syndrome": {"Z": [3], "X": []}}  stabilizers reading -1
+    {"correction": {"1,1": "X"}}                   the decoder's fix
+
+Stabilizer indices follow LatticeGeometry's z_rc/x_rc order. Events are
+parsed one line at a time, so a long log is never held in memory.
+
+    python record.py --distance 5 --rounds 5 -p 0.02 --seed 1 -o run.jsonl
+"""
+import argparse
+import json
+
+import numpy as np
+
+from decoder import DecodingGraph, UnionFindDecoder
+from lattice import LatticeGeometry
+from syndrome import ExtractionRounds, SyndromeBackend
+
+
+def _pauli_map(x, z, cols):
+    """{"r,c": pauli} for the nonzero entries of x/z bit arrays."""
+    names = {(1, 0): "X", (1, 1): "Y", (0, 1): "Z"}
+    return {
+        f"{i // cols},{i % cols}": names[int(x[i]), int(z[i])]
+        for i in np.flatnonzero(x | z)
+    }
+
+
+def parse_paulis(pattern):
+    """{"r,c": pauli} from a record -> {(r, c): pauli} as SyndromeBackend.pauli() takes it."""
+    return {tuple(int(v) for v in key.split(",")): pauli for key, pauli in pattern.items()}
+
+
+class RunRecord:
+    """Lazy reader for a recorded run."""
+    def __init__(self, path):
+        self.path = path
+        with open(path) as f:
+            self.header = json.loads(f.readline())
+        self.rows = self.header["rows"]
+        self.cols = self.header["cols"]
+        self.rotated = self.header.get("rotated", False)
+
+    def events(self):
+        with open(self.path) as f:
+            f.readline()
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def simulate(path, geometry, rounds, p, seed=None):
+    """Write a simulated run: per-round depolarizing errors, noisy syndromes and a UF correction.
+
+    The correction decodes the final, perfectly read-out syndrome of each type.
+    """
+    backend = SyndromeBackend(geometry)
+    stream = ExtractionRounds(backend, rounds, p, rng=seed)
+    z_synd = np.zeros(len(backend.hz), dtype=np.uint8)
+    x_synd = np.zeros(len(backend.hx), dtype=np.uint8)
+    prev_x, prev_z = stream.x.copy(), stream.z.copy()
+    with open(path, "w") as f:
+        f.write(json.dumps({"rows": geometry.rows, "cols": geometry.cols, "rotated": geometry.rotated}) + "\n")
+        for r, z_events, x_events in stream:
+            new = _pauli_map(stream.x ^ prev_x, stream.z ^ prev_z, geometry.cols)
+            prev_x, prev_z = stream.x.copy(), stream.z.copy()
+            if new:
+                f.write(json.dumps({"round": r, "errors": new}) + "\n")
+            z_synd ^= z_events
+            x_synd ^= x_events
+            f.write(json.dumps({"round": r, "syndrome": {
+                "Z": np.flatnonzero(z_synd).tolist(), "X": np.flatnonzero(x_synd).tolist(),
+            }}) + "\n")
+        x_fix, _ = UnionFindDecoder(DecodingGraph(backend.hz)).decode(z_synd)
+        z_fix, _ = UnionFindDecoder(DecodingGraph(backend.hx)).decode(x_synd)
+        f.write(json.dumps({"correction": _pauli_map(x_fix, z_fix, geometry.cols)}) + "\n")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--distance", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("-p", type=float, default=0.02, help="depolarizing and measurement error rate")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("-o", "--output", default="run.jsonl")
+    args = parser.parse_args(argv)
+
+    geometry = LatticeGeometry(args.distance, args.distance, rotated=True)
+    simulate(args.output, geometry, args.rounds, args.p, args.seed)
+
+
+if __name__ == "__main__":
+    main_cli()
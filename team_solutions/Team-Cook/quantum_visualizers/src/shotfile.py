@@ -0,0 +1,151 @@
+"""Bit-packed detection-event files, memory-mapped for reading single shots.
+
+Layout: 8-byte magic, little-endian uint32 header length, a JSON header
+(lattice shape, rounds, shot count and stabilizer ordering), zero padding
+to a 64-byte boundary, then one row of uint64 words per shot. A row holds
+rounds x (Z checks + X checks) bits, round-major with Z checks first, in
+the order listed in the header.
+
+    python shotfile.py --distance 5 --rounds 5 -p 0.001 --shots 1000000 -o shots.qshot
+"""
+import argparse
+import json
+import struct
+
+import numpy as np
+
+from lattice import LatticeGeometry
+from syndrome import SyndromeBackend, pack_bits
+
+MAGIC = b"QSHOT\x00\x01\x00"
+ALIGN = 64
+CHUNK_SHOTS = 1 << 14
+
+
+def stabilizer_order(geometry):
+    return [["Z", int(r), int(c)] for r, c in geometry.z_rc] + [["X", int(r), int(c)] for r, c in geometry.x_rc]
+
+
+class ShotWriter:
+    """Append bit-packed detection events; the shot count is patched in on close()."""
+    def __init__(self, path, geometry, rounds):
+        self.path = path
+        self.rounds = rounds
+        self.num_checks = len(geometry.z_rc) + len(geometry.x_rc)
+        self.words = -(-rounds * self.num_checks // 64)
+        self.header = {
+            "rows": geometry.rows,
+            "cols": geometry.cols,
+            "rotated": geometry.rotated,
+            "distance": min(geometry.rows, geometry.cols),
+            "rounds": rounds,
+            "shots": 0,
+            "words": self.words,
+            "stabilizers": stabilizer_order(geometry),
+        }
+        self.file = open(path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        # Reserve digits for the shot count so the patched header keeps its length.
+        text = json.dumps({**self.header, "shots": f"{self.header['shots']:020d}"}).encode()
+        self.file.seek(0)
+        self.file.write(MAGIC + struct.pack("<I", len(text)) + text)
+        self.file.write(b"\0" * (-self.file.tell() % ALIGN))
+        self.data_offset = self.file.tell()
+
+    def write(self, events):
+        """Append (S, rounds * num_checks) 0/1 events, one row per shot."""
+        events = np.atleast_2d(events)
+        self.file.seek(0, 2)
+        self.file.write(np.ascontiguousarray(pack_bits(events), dtype="<u8").tobytes())
+        self.header["shots"] += len(events)
+
+    def close(self):
+        self._write_header()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShotFile:
+    """Read-only view of a shot file; rows stay on disk until a shot is touched."""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a shot file")
+            (length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length))
+        header["shots"] = int(header["shots"])
+        offset = len(MAGIC) + 4 + length
+        offset += -offset % ALIGN
+        self.header = header
+        self.rounds = header["rounds"]
+        self.stabilizers = header["stabilizers"]
+        self.num_z = sum(kind == "Z" for kind, _, _ in self.stabilizers)
+        self.words = np.memmap(path, dtype="<u8", mode="r", offset=offset,
+                               shape=(header["shots"], header["words"]))
+
+    def __len__(self):
+        return len(self.words)
+
+    def geometry(self, spacing=0.75, center=(0, 0, 0)):
+        h = self.header
+        return LatticeGeometry(h["rows"], h["cols"], spacing, center, rotated=h["rotated"])
+
+    def shot(self, index):
+        """Detection events of one shot as a (rounds, num_checks) uint8 array."""
+        bits = np.unpackbits(self.words[index].view(np.uint8), bitorder="little")
+        return bits[:self.rounds * len(self.stabilizers)].reshape(self.rounds, -1)
+
+    def events(self, index):
+        """Yield (round, z_events, x_events) for one shot, like ExtractionRounds."""
+        for r, row in enumerate(self.shot(index)):
+            yield r, row[:self.num_z], row[self.num_z:]
+
+
+def sample_batches(backend, rounds, p, shots, rng=None, chunk=CHUNK_SHOTS):
+    """Yield (S, rounds * num_checks) detection events for i.i.d. X/Z data errors and
+    measurement flips of rate p per round (the last round is read out perfectly)."""
+    rng = np.random.default_rng(rng)
+    n = backend.num_data
+    for start in range(0, shots, chunk):
+        size = min(chunk, shots - start)
+        x = np.zeros((size, n), dtype=np.uint8)
+        z = np.zeros((size, n), dtype=np.uint8)
+        prev = None
+        events = []
+        for r in range(rounds):
+            x ^= (rng.random((size, n)) < p).astype(np.uint8)
+            z ^= (rng.random((size, n)) < p).astype(np.uint8)
+            synd = np.concatenate(backend.measure(x, z), axis=1)
+            if r + 1 < rounds:
+                synd ^= (rng.random(synd.shape) < p).astype(np.uint8)
+            events.append(synd if prev is None else synd ^ prev)
+            prev = synd
+        yield np.concatenate(events, axis=1)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--distance", type=int, default=5)
+    parser.add_argument("--rounds", type=int, help="rounds per shot (default: the distance)")
+    parser.add_argument("-p", type=float, default=0.001, help="data and measurement error rate")
+    parser.add_argument("--shots", type=int, default=100_000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("-o", "--output", default="shots.qshot")
+    args = parser.parse_args(argv)
+
+    geometry = LatticeGeometry(args.distance, args.distance, rotated=True)
+    rounds = args.rounds or args.distance
+    with ShotWriter(args.output, geometry, rounds) as writer:
+        for batch in sample_batches(SyndromeBackend(geometry), rounds, args.p, args.shots, args.seed):
+            writer.write(batch)
+
+
+if __name__ == "__main__":
+    main_cli()
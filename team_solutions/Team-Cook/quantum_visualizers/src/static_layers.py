@@ -0,0 +1,76 @@
+import numpy as np
+from manim.utils.family import extract_mobject_family_members
+
+# Extra room around animated regions for stroke width and anti-aliasing.
+BOUNDS_MARGIN = 0.1
+
+
+def _bounds(mobjects):
+    points = [m.points for mob in mobjects for m in mob.family_members_with_points()]
+    if not points:
+        return None
+    points = np.concatenate(points)
+    return points[:, :2].min(axis=0) - BOUNDS_MARGIN, points[:, :2].max(axis=0) + BOUNDS_MARGIN
+
+
+def animation_bounds(anim):
+    """Return the 2D boxes an animation can touch, or None if it cannot be bounded.
+
+    Straight-path animations stay within their start and target states, so
+    the union of those boxes covers every frame. Arc paths are not bounded.
+    """
+    if hasattr(anim, "animations"):
+        boxes = []
+        for sub in anim.animations:
+            sub_boxes = animation_bounds(sub)
+            if sub_boxes is None:
+                return None
+            boxes += sub_boxes
+        return boxes
+    if getattr(anim, "path_arc", 0):
+        return None
+    states = [anim.mobject]
+    for name in ("starting_mobject", "target_copy"):
+        state = getattr(anim, name, None)
+        if state is not None:
+            states.append(state)
+    boxes = [_bounds([state]) for state in states]
+    return [box for box in boxes if box is not None]
+
+
+def _overlaps(box, boxes):
+    lo, hi = box
+    return any(np.all(lo <= other_hi) and np.all(other_lo <= hi) for other_lo, other_hi in boxes)
+
+
+class StaticLayerMixin:
+    """Scene mixin that keeps untouched mobjects in the cached static frame.
+
+    Cairo scenes treat everything after the first animated mobject as moving
+    and redraw it every frame. This narrows that to the animated families,
+    mobjects with updaters, foreground mobjects and anything overlapping the
+    animated region. The rest is painted once into the static background.
+    """
+    def get_moving_mobjects(self, *animations):
+        moving = super().get_moving_mobjects(*animations)
+        if not moving:
+            return moving
+
+        animated = set()
+        boxes = []
+        for anim in animations:
+            animated.update(id(m) for m in anim.mobject.get_family())
+            anim_boxes = animation_bounds(anim)
+            if anim_boxes is None:
+                return moving
+            boxes += anim_boxes
+
+        keep = []
+        for mob in moving:
+            if mob.get_family_updaters() or mob in self.foreground_mobjects:
+                keep.append(mob)
+                continue
+            for leaf in extract_mobject_family_members([mob], only_those_with_points=True):
+                if id(leaf) in animated or _overlaps(_bounds([leaf]), boxes):
+                    keep.append(leaf)
+        return keep
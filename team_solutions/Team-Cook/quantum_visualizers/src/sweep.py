@@ -0,0 +1,127 @@
+"""Monte-Carlo logical error rates of the rotated patch over physical error rates.
+
+Each distance uses the same LatticeGeometry that build_lattice() draws.
+Shots get i.i.d. X and Z errors of rate p, are checked in bit-packed batches
+and decoded with the union-find decoder. Work is split into fixed-size
+chunks over a process pool, so memory per worker does not grow with shots.
+The JSON output drives the ThresholdPlot scene in main.py.
+
+    python sweep.py --distances 3 5 7 9 --rates 0.02 0.05 0.08 0.1 0.12 --shots 1000000 -o sweep.json
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from decoder import DecodingGraph, UnionFindDecoder
+from lattice import LatticeGeometry
+from syndrome import SyndromeBackend
+
+CHUNK_SHOTS = 1 << 14
+
+_codes = {}
+
+
+def _code(distance):
+    """Backend, decoders and logicals for a distance, built once per worker."""
+    if distance not in _codes:
+        backend = SyndromeBackend(LatticeGeometry(distance, distance, rotated=True))
+        x_logical, z_logical = backend.logicals()
+        _codes[distance] = (
+            backend,
+            UnionFindDecoder(DecodingGraph(backend.hz)),
+            UnionFindDecoder(DecodingGraph(backend.hx)),
+            x_logical,
+            z_logical,
+        )
+    return _codes[distance]
+
+
+def _decode_all(decoder, syndromes):
+    """Corrections for a batch of syndromes; repeated syndromes are decoded once."""
+    corrections = np.zeros((len(syndromes), decoder.graph.num_data), dtype=np.uint8)
+    seen = {}
+    for shot in np.flatnonzero(syndromes.any(axis=1)):
+        key = syndromes[shot].tobytes()
+        if key not in seen:
+            seen[key] = decoder.decode(syndromes[shot])[0]
+        corrections[shot] = seen[key]
+    return corrections
+
+
+def run_chunk(distance, p, shots, seed):
+    """Return the number of logical failures in `shots` code-capacity shots."""
+    backend, z_decoder, x_decoder, x_logical, z_logical = _code(distance)
+    rng = np.random.default_rng(seed)
+    x = (rng.random((shots, backend.num_data)) < p).astype(np.uint8)
+    z = (rng.random((shots, backend.num_data)) < p).astype(np.uint8)
+    z_synd, x_synd = backend.measure(x, z)
+    x ^= _decode_all(z_decoder, z_synd)
+    z ^= _decode_all(x_decoder, x_synd)
+    # uint8 products wrap mod 256, which keeps the parity
+    failed = ((x @ z_logical) & 1) | ((z @ x_logical) & 1)
+    return int(failed.sum())
+
+
+def sweep(distances, rates, shots, workers=None, seed=0, chunk=CHUNK_SHOTS):
+    """Return {"distances", "rates", "shots", "logical"}; logical[i][j] is distance i at rate j."""
+    tasks = []
+    for d in distances:
+        for p in rates:
+            sizes = [chunk] * (shots // chunk) + ([shots % chunk] if shots % chunk else [])
+            tasks.append([(d, p, n) for n in sizes])
+    seeds = iter(np.random.SeedSequence(seed).spawn(sum(len(t) for t in tasks)))
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [[pool.submit(run_chunk, d, p, n, next(seeds)) for d, p, n in task] for task in tasks]
+        failures = [sum(f.result() for f in task) for task in futures]
+
+    logical = np.array(failures, dtype=float).reshape(len(distances), len(rates)) / shots
+    return {
+        "distances": list(distances),
+        "rates": list(rates),
+        "shots": shots,
+        "logical": logical.tolist(),
+    }
+
+
+def estimate_threshold(result):
+    """Rate where the largest distance stops beating the smallest, interpolated in log-log.
+
+    Returns None when the curves do not cross inside the swept rates.
+    """
+    rates = np.log(np.array(result["rates"]))
+    logical = np.array(result["logical"])
+    gap = np.log(np.maximum(logical[-1], 1e-12)) - np.log(np.maximum(logical[0], 1e-12))
+    crossings = np.flatnonzero((gap[:-1] < 0) & (gap[1:] >= 0))
+    if not len(crossings):
+        return None
+    i = crossings[0]
+    t = gap[i] / (gap[i] - gap[i + 1])
+    return float(np.exp(rates[i] + t * (rates[i + 1] - rates[i])))
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--distances", type=int, nargs="+", default=[3, 5, 7, 9])
+    parser.add_argument("--rates", type=float, nargs="+", default=[0.02, 0.04, 0.06, 0.08, 0.1, 0.12, 0.14])
+    parser.add_argument("--shots", type=int, default=100_000, help="shots per (distance, rate)")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="sweep.json")
+    args = parser.parse_args(argv)
+
+    result = sweep(args.distances, args.rates, args.shots, args.jobs, args.seed)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    for d, row in zip(result["distances"], result["logical"]):
+        print(f"d={d:3d}  " + "  ".join(f"{rate:.2e}" for rate in row))
+    threshold = estimate_threshold(result)
+    if threshold is not None:
+        print(f"threshold ~ {threshold:.3f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,149 @@
+"""Parity-check syndrome backend for the surface-code patch.
+
+A Pauli error is two 0/1 arrays over the data qubits: `x` (bit flips) and
+`z` (phase flips); Y sets both. Z stabilizers see the x bits and X
+stabilizers see the z bits. Error rows are packed into uint64 words, so a
+batch of shots is checked against every stabilizer with AND + popcount.
+"""
+import numpy as np
+
+PAULI_BITS = {"I": (0, 0), "X": (1, 0), "Y": (1, 1), "Z": (0, 1)}
+
+
+def parity_check(nbrs, num_data):
+    """(M, num_data) uint8 check matrix from a padded (M, 4) neighbour array."""
+    h = np.zeros((len(nbrs), num_data), dtype=np.uint8)
+    rows, slots = np.nonzero(nbrs >= 0)
+    h[rows, nbrs[rows, slots]] = 1
+    return h
+
+
+def pack_bits(bits):
+    """Pack (..., n) 0/1 arrays into (..., ceil(n / 64)) uint64 words."""
+    bits = np.asarray(bits, dtype=np.uint8)
+    n = bits.shape[-1]
+    padded = np.zeros(bits.shape[:-1] + (-(-n // 64) * 64,), dtype=np.uint8)
+    padded[..., :n] = bits
+    return np.packbits(padded, axis=-1, bitorder="little").view(np.uint64)
+
+
+def packed_parity(errors, checks):
+    """GF(2) product of packed errors (S, W) and checks (M, W): (S, M) uint8."""
+    parity = np.zeros((len(errors), len(checks)), dtype=np.uint8)
+    for w in range(errors.shape[1]):
+        parity ^= np.bitwise_count(errors[:, w, None] & checks[None, :, w]).astype(np.uint8)
+    return parity & 1
+
+
+class SyndromeBackend:
+    """Check matrices of a LatticeGeometry plus batched syndrome evaluation."""
+    def __init__(self, geometry):
+        self.geometry = geometry
+        self.num_data = geometry.num_data
+        self.hz = parity_check(geometry.z_nbrs, self.num_data)
+        self.hx = parity_check(geometry.x_nbrs, self.num_data)
+        self.hz_words = pack_bits(self.hz)
+        self.hx_words = pack_bits(self.hx)
+
+    def pauli(self, errors):
+        """Return (x, z) bits for a {(row, col): "X" | "Y" | "Z"} error pattern."""
+        x = np.zeros(self.num_data, dtype=np.uint8)
+        z = np.zeros(self.num_data, dtype=np.uint8)
+        rows, cols = self.geometry.rows, self.geometry.cols
+        for (r, c), pauli in errors.items():
+            if not (0 <= r < rows and 0 <= c < cols):
+                raise ValueError(f"data qubit {(r, c)} is outside the {rows} x {cols} lattice")
+            idx = r * cols + c
+            x[idx], z[idx] = PAULI_BITS[pauli.upper()]
+        return x, z
+
+    def logicals(self):
+        """Return (x_logical, z_logical) supports as data-qubit indicator vectors.
+
+        Each is the first full data row or column that commutes with the
+        opposite check type, i.e. a minimum-weight logical of the patch.
+        """
+        rows, cols = self.geometry.rows, self.geometry.cols
+        lines = []
+        for r in range(rows):
+            line = np.zeros(self.num_data, dtype=np.uint8)
+            line[r * cols:(r + 1) * cols] = 1
+            lines.append(line)
+        for c in range(cols):
+            line = np.zeros(self.num_data, dtype=np.uint8)
+            line[c::cols] = 1
+            lines.append(line)
+        x_logical = next((line for line in lines if not (self.hz.astype(int) @ line % 2).any()), None)
+        z_logical = next((line for line in lines if not (self.hx.astype(int) @ line % 2).any()), None)
+        return x_logical, z_logical
+
+    def measure(self, x, z):
+        """Return (z_syndrome, x_syndrome) for one error (n,) or a batch (S, n)."""
+        single = np.ndim(x) == 1
+        z_synd = packed_parity(pack_bits(np.atleast_2d(x)), self.hz_words)
+        x_synd = packed_parity(pack_bits(np.atleast_2d(z)), self.hx_words)
+        if single:
+            return z_synd[0], x_synd[0]
+        return z_synd, x_synd
+
+    def sample(self, p, shots, rng=None):
+        """Depolarizing errors: each data qubit gets X, Y or Z with probability p / 3."""
+        rng = np.random.default_rng(rng)
+        hit = rng.random((shots, self.num_data)) < p
+        kind = np.where(hit, rng.integers(1, 4, (shots, self.num_data)), 0)
+        x = ((kind == 1) | (kind == 2)).astype(np.uint8)
+        z = ((kind == 2) | (kind == 3)).astype(np.uint8)
+        return x, z
+
+
+class ExtractionRounds:
+    """Repeated noisy extraction rounds, iterated lazily as detection events.
+
+    Each round applies scripted errors ({round: {(row, col): pauli}}) and
+    depolarizing data errors of rate p, measures both check types with
+    outcome flips of rate q (the last round is read out perfectly), and
+    yields (round, z_events, x_events): the checks whose outcome changed
+    since the previous round. Only the current error and the previous
+    syndrome are kept, so memory stays flat however many rounds run.
+    Every iteration starts from a clean lattice and the same random state,
+    so iterating twice replays the same rounds.
+    """
+    def __init__(self, backend, rounds, p=0.0, q=None, errors=None, rng=None):
+        self.backend = backend
+        self.rounds = rounds
+        self.p = p
+        self.q = p if q is None else q
+        self.errors = errors or {}
+        bit_generator = np.random.default_rng(rng).bit_generator
+        self._bit_generator_type = type(bit_generator)
+        self._rng_state = bit_generator.state
+        self.reset()
+
+    def reset(self):
+        """Clear the error state and rewind the random stream to its start."""
+        bit_generator = self._bit_generator_type()
+        bit_generator.state = self._rng_state
+        self.rng = np.random.Generator(bit_generator)
+        self.x = np.zeros(self.backend.num_data, dtype=np.uint8)
+        self.z = np.zeros(self.backend.num_data, dtype=np.uint8)
+
+    def __iter__(self):
+        self.reset()
+        backend = self.backend
+        prev_z = np.zeros(len(backend.hz), dtype=np.uint8)
+        prev_x = np.zeros(len(backend.hx), dtype=np.uint8)
+        for r in range(self.rounds):
+            if self.p:
+                x, z = backend.sample(self.p, 1, self.rng)
+                self.x ^= x[0]
+                self.z ^= z[0]
+            if r in self.errors:
+                x, z = backend.pauli(self.errors[r])
+                self.x ^= x
+                self.z ^= z
+            z_synd, x_synd = backend.measure(self.x, self.z)
+            if self.q and r + 1 < self.rounds:
+                z_synd = z_synd ^ (self.rng.random(len(z_synd)) < self.q).astype(np.uint8)
+                x_synd = x_synd ^ (self.rng.random(len(x_synd)) < self.q).astype(np.uint8)
+            yield r, z_synd ^ prev_z, x_synd ^ prev_x
+            prev_z, prev_x = z_synd, x_synd
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from decoder import DecodingGraph, UnionFindDecoder, sample_rounds
+from lattice import LatticeGeometry
+from syndrome import SyndromeBackend
+
+
+@pytest.fixture
+def backend():
+    return SyndromeBackend(LatticeGeometry(5, 5, rotated=True))
+
+
+@pytest.mark.parametrize("qubits", [[12], [0], [4, 20], [6, 7, 18]])
+def test_correction_clears_the_syndrome(backend, qubits):
+    x = np.zeros(backend.num_data, dtype=np.uint8)
+    x[qubits] = 1
+    z_synd, _ = backend.measure(x, np.zeros_like(x))
+    correction, _ = UnionFindDecoder(DecodingGraph(backend.hz)).decode(z_synd)
+    residual, _ = backend.measure(x ^ correction, np.zeros_like(x))
+    assert not residual.any()
+
+
+def test_repeated_rounds_correction_clears_the_final_syndrome(backend):
+    rounds = 5
+    decoder = UnionFindDecoder(DecodingGraph(backend.hz, rounds))
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        x, detections = sample_rounds(backend, 0.02, rounds, rng)
+        correction, _ = decoder.decode(detections)
+        residual, _ = backend.measure(x ^ correction, np.zeros_like(x))
+        assert not residual.any()
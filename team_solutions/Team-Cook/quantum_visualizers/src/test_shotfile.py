@@ -0,0 +1,24 @@
+import numpy as np
+
+from lattice import LatticeGeometry
+from shotfile import ShotFile, ShotWriter, sample_batches
+from syndrome import SyndromeBackend
+
+
+def test_shot_file_round_trip(tmp_path):
+    geometry = LatticeGeometry(3, 3, rotated=True)
+    rounds = 4
+    batches = list(sample_batches(SyndromeBackend(geometry), rounds, 0.1, 50, rng=1, chunk=20))
+    path = tmp_path / "shots.qshot"
+    with ShotWriter(path, geometry, rounds) as writer:
+        for batch in batches:
+            writer.write(batch)
+
+    shots = ShotFile(path)
+    events = np.concatenate(batches)
+    assert len(shots) == len(events) == 50
+    for index, expected in enumerate(events):
+        np.testing.assert_array_equal(shots.shot(index).ravel(), expected)
+    restored = shots.geometry()
+    np.testing.assert_array_equal(restored.z_rc, geometry.z_rc)
+    np.testing.assert_array_equal(restored.x_rc, geometry.x_rc)
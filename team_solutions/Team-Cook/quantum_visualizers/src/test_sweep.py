@@ -0,0 +1,11 @@
+from sweep import estimate_threshold, run_chunk
+
+
+def test_noiseless_chunk_never_fails():
+    assert run_chunk(3, 0.0, 100, seed=0) == 0
+
+
+def test_threshold_between_crossing_rates():
+    result = {"rates": [0.01, 0.1], "logical": [[0.01, 0.1], [0.001, 0.3]]}
+    assert 0.01 < estimate_threshold(result) < 0.1
+    assert estimate_threshold({"rates": [0.01, 0.1], "logical": [[0.1, 0.2], [0.01, 0.02]]}) is None
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from lattice import LatticeGeometry
+from syndrome import ExtractionRounds, SyndromeBackend
+
+
+@pytest.fixture
+def backend():
+    return SyndromeBackend(LatticeGeometry(5, 5, rotated=True))
+
+
+def test_single_error_flips_its_checks(backend):
+    x, z = backend.pauli({(2, 2): "X"})
+    z_synd, x_synd = backend.measure(x, z)
+    assert z_synd.sum() == 2
+    assert not x_synd.any()
+
+
+def test_logicals_commute_with_all_checks(backend):
+    x_logical, z_logical = backend.logicals()
+    z_synd, x_synd = backend.measure(x_logical, z_logical)
+    assert not z_synd.any() and not x_synd.any()
+
+
+def test_pauli_rejects_qubits_outside_the_lattice(backend):
+    with pytest.raises(ValueError):
+        backend.pauli({(5, 0): "X"})
+
+
+def test_extraction_rounds_replay_identically(backend):
+    rounds = ExtractionRounds(backend, 6, p=0.05, errors={2: {(1, 1): "Y"}}, rng=7)
+    first = [(r, z.copy(), x.copy()) for r, z, x in rounds]
+    second = [(r, z.copy(), x.copy()) for r, z, x in rounds]
+    assert len(first) == 6
+    for (r1, z1, x1), (r2, z2, x2) in zip(first, second):
+        assert r1 == r2
+        np.testing.assert_array_equal(z1, z2)
+        np.testing.assert_array_equal(x1, x2)